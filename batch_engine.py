@@ -0,0 +1,212 @@
+"""Vectorized Snake engine that steps many games at once with NumPy.
+
+BatchSnakeEngine follows the same rules as SnakeEngine in snake_engine.py
+(wrap-around edges or walls, food, special food and the food relocation timer) but
+keeps N boards in NumPy arrays and advances all of them in one step() call.
+Finished games are reset automatically so the batch never shrinks. Like
+SnakeEngine, it measures special food lifetime in ticks.
+"""
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from snake_engine import (
+    DEFAULT_SPEED, Difficulty, Direction, FOOD_RELOCATE_MOVES, NO_CELL, Rules, SPECIAL_FOOD_CHANCE,
+    SPECIAL_FOOD_LIFETIME, SPECIAL_FOOD_POINTS, DEFAULT_WINDOW_SIZE, WALL,
+    grid_dimensions, neighbour_tables,
+)
+
+# Action indices used by step(); -1 keeps the current direction. They match
+# the rows of snake_engine.neighbour_tables.
+DIRECTIONS = [Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT]
+DIRECTION_INDEX = {direction: i for i, direction in enumerate(DIRECTIONS)}
+NO_ACTION = -1
+_OPPOSITE = np.array([1, 0, 3, 2], dtype=np.int8)
+
+# Values written by BatchSnakeEngine.boards()
+EMPTY, BODY, HEAD, FOOD, SPECIAL_FOOD = range(5)
+
+
+class BatchStepResult(NamedTuple):
+    """Per-game outcome of one batched step, taken before finished games are reset"""
+    ate_food: np.ndarray
+    ate_special: np.ndarray
+    died: np.ndarray
+    won: np.ndarray
+    score: np.ndarray
+    length: np.ndarray
+    ticks: np.ndarray
+
+
+class BatchSnakeEngine:
+    """N independent Snake games stored as NumPy arrays"""
+
+    def __init__(self, num_games: int, grid_width: int, grid_height: int,
+                 score_multiplier: int = 1, seed: Optional[int] = None, rules: Rules = Rules.WRAP,
+                 speed: int = DEFAULT_SPEED):
+        self.num_games = num_games
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.area = grid_width * grid_height
+        self.score_multiplier = score_multiplier
+        self.rules = rules
+        self.special_food_lifetime = SPECIAL_FOOD_LIFETIME * speed  # In ticks
+        self.rng = np.random.default_rng(seed)
+
+        # neighbours[direction, cell] is the next cell, or WALL
+        self.neighbours = np.array(neighbour_tables(grid_width, grid_height, rules)[:len(DIRECTIONS)],
+                                   dtype=np.int64)
+
+        # Ring buffers of flat cell indices, as in SnakeEngine, plus one
+        # occupancy plane per game
+        self.body = np.zeros((num_games, self.area), dtype=np.int32)
+        self.occupied = np.zeros((num_games, self.area), dtype=bool)
+        self.head = np.zeros(num_games, dtype=np.int64)
+        self.tail = np.zeros(num_games, dtype=np.int64)
+        self.length = np.zeros(num_games, dtype=np.int64)
+        self.direction = np.zeros(num_games, dtype=np.int8)
+        self.food = np.full(num_games, NO_CELL, dtype=np.int64)
+        self.special_food = np.full(num_games, NO_CELL, dtype=np.int64)
+        self.special_spawn_tick = np.zeros(num_games, dtype=np.int64)
+        self.score = np.zeros(num_games, dtype=np.int64)
+        self.food_timer = np.zeros(num_games, dtype=np.int64)
+        self.ticks = np.zeros(num_games, dtype=np.int64)
+        self._rows = np.arange(num_games)
+
+        self.reset()
+
+    @classmethod
+    def for_difficulty(cls, num_games: int, difficulty: Difficulty,
+                       window_size: Tuple[int, int] = DEFAULT_WINDOW_SIZE,
+                       seed: Optional[int] = None, rules: Rules = Rules.WRAP) -> 'BatchSnakeEngine':
+        """Create a batch with the board size and scoring of a difficulty level"""
+        grid_width, grid_height = grid_dimensions(difficulty, window_size)
+        return cls(num_games, grid_width, grid_height, difficulty.value['score_multiplier'], seed, rules,
+                   difficulty.value['speed'])
+
+    def reset(self, games: Optional[np.ndarray] = None):
+        """Reset the given games (all of them by default) to a fresh start"""
+        rows = self._rows if games is None else np.asarray(games)
+        if rows.size == 0:
+            return
+        head_x, head_y = self.grid_width // 2, self.grid_height // 2
+        head_cell = head_y * self.grid_width + head_x
+        tail_cell = head_y * self.grid_width + (head_x - 1) % self.grid_width
+
+        self.occupied[rows] = False
+        self.body[rows, 0] = tail_cell
+        self.body[rows, 1] = head_cell
+        self.occupied[rows, tail_cell] = True
+        self.occupied[rows, head_cell] = True
+        self.tail[rows] = 0
+        self.head[rows] = 1
+        self.length[rows] = 2
+        self.direction[rows] = DIRECTION_INDEX[Direction.RIGHT]
+        self.special_food[rows] = NO_CELL
+        self.food[rows] = NO_CELL
+        self.score[rows] = 0
+        self.food_timer[rows] = 0
+        self.ticks[rows] = 0
+        self.food[rows] = self._random_free_cells(rows)
+
+    def _random_free_cells(self, rows: np.ndarray) -> np.ndarray:
+        """Pick a random cell holding neither snake nor food for each game in rows"""
+        if rows.size == 0:
+            return np.empty(0, dtype=np.int64)
+        blocked = self.occupied[rows].copy()
+        for items in (self.food, self.special_food):
+            has_item = items[rows] != NO_CELL
+            blocked[has_item.nonzero()[0], items[rows][has_item]] = True
+        # Random keys with blocked cells pushed below every free cell
+        keys = self.rng.random(blocked.shape)
+        keys[blocked] = -1.0
+        cells = keys.argmax(axis=1)
+        return np.where(keys[np.arange(rows.size), cells] < 0, NO_CELL, cells)
+
+    def step(self, actions=None) -> BatchStepResult:
+        """Advance every game by one move; actions are DIRECTIONS indices or NO_ACTION"""
+        rows = self._rows
+        area = self.area
+
+        # Ignore turns that would reverse the snake into itself
+        if actions is not None:
+            actions = np.asarray(actions, dtype=np.int8)
+            turn = (actions != NO_ACTION) & (actions != _OPPOSITE[self.direction])
+            self.direction = np.where(turn, actions, self.direction).astype(np.int8)
+        self.ticks += 1
+
+        # Move snake
+        head_cell = self.body[rows, self.head]
+        new_cell = self.neighbours[self.direction, head_cell]
+
+        # Check for collision with a wall or with self (the tail has not moved
+        # yet, so it counts)
+        hit_wall = new_cell == WALL
+        died = hit_wall | self.occupied[rows, np.where(hit_wall, 0, new_cell)]
+        alive = ~died
+        moving = alive.nonzero()[0]
+        self.head[moving] = (self.head[moving] + 1) % area
+        self.body[moving, self.head[moving]] = new_cell[moving]
+        self.occupied[moving, new_cell[moving]] = True
+        self.length[moving] += 1
+
+        # Check if food is eaten
+        ate_food = alive & (new_cell == self.food)
+        eaters = ate_food.nonzero()[0]
+        self.score[eaters] += self.score_multiplier
+        self.food[eaters] = NO_CELL
+        self.food[eaters] = self._random_free_cells(eaters)
+
+        # Chance to spawn special food, rolled twice as in SnakeEngine.generate_special_food
+        spawn = (ate_food & (self.rng.random(self.num_games) < SPECIAL_FOOD_CHANCE)
+                 & (self.special_food == NO_CELL)
+                 & (self.rng.random(self.num_games) < SPECIAL_FOOD_CHANCE))
+        spawners = spawn.nonzero()[0]
+        self.special_food[spawners] = self._random_free_cells(spawners)
+        self.special_spawn_tick[spawners] = self.ticks[spawners]
+
+        # Check if special food is eaten
+        ate_special = alive & (self.special_food != NO_CELL) & (new_cell == self.special_food)
+        self.score[ate_special] += SPECIAL_FOOD_POINTS * self.score_multiplier
+        self.special_food[ate_special] = NO_CELL
+
+        # Remove tail only if no food was eaten
+        popping = (alive & ~(ate_food | ate_special)).nonzero()[0]
+        self.occupied[popping, self.body[popping, self.tail[popping]]] = False
+        self.tail[popping] = (self.tail[popping] + 1) % area
+        self.length[popping] -= 1
+
+        # A snake covering the whole board has won
+        won = alive & (self.length == area)
+        playing = alive & ~won
+
+        # Special food disappears after its lifetime
+        expired = (playing & (self.special_food != NO_CELL)
+                   & (self.ticks - self.special_spawn_tick > self.special_food_lifetime))
+        self.special_food[expired] = NO_CELL
+
+        # Update food timer, moving uneaten food and placing food that could
+        # not be placed while the board was full
+        self.food_timer[playing] += 1
+        relocate = playing & (self.food_timer > FOOD_RELOCATE_MOVES)
+        self.food_timer[relocate] = 0
+        self.food[relocate] = NO_CELL
+        missing = (playing & (self.food == NO_CELL)).nonzero()[0]
+        self.food[missing] = self._random_free_cells(missing)
+
+        result = BatchStepResult(
+            ate_food=ate_food, ate_special=ate_special, died=died, won=won,
+            score=self.score.copy(), length=self.length.copy(), ticks=self.ticks.copy(),
+        )
+        self.reset((died | won).nonzero()[0])
+        return result
+
+    def boards(self) -> np.ndarray:
+        """Return an (N, grid_height, grid_width) int8 array of cell contents"""
+        boards = np.where(self.occupied, BODY, EMPTY).astype(np.int8)
+        rows = self._rows
+        boards[rows, self.body[rows, self.head]] = HEAD
+        for items, value in ((self.food, FOOD), (self.special_food, SPECIAL_FOOD)):
+            present = (items != NO_CELL).nonzero()[0]
+            boards[present, items[present]] = value
+        return boards.reshape(self.num_games, self.grid_height, self.grid_width)
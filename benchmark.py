@@ -0,0 +1,66 @@
+"""Micro-benchmarks for the headless Snake engine.
+
+Run with: python benchmark.py
+"""
+import time
+
+from snake_engine import Direction, SnakeEngine
+
+BOARD_WIDTH = 8192
+BOARD_HEIGHT = 4
+SNAKE_LENGTHS = [10, 100, 1000, 4000]
+TICKS = 2000
+FILL_RATIOS = [0.1, 0.5, 0.9, 0.99]
+PLACEMENTS = 20000
+
+
+def bench_tick_vs_length(lengths=SNAKE_LENGTHS, ticks=TICKS):
+    """Time engine.step() for snakes of increasing length"""
+    results = []
+    for length in lengths:
+        engine = SnakeEngine(BOARD_WIDTH, BOARD_HEIGHT)
+        # A straight snake along the top row, heading right into empty cells
+        engine.set_snake([(x, 0) for x in range(length - 1, -1, -1)])
+        engine.direction = Direction.RIGHT
+        engine.place_food((BOARD_WIDTH - 1, BOARD_HEIGHT - 1))
+
+        start = time.perf_counter()
+        for _ in range(ticks):
+            engine.step(Direction.RIGHT)
+        elapsed = time.perf_counter() - start
+        results.append((length, elapsed / ticks * 1e6))
+    return results
+
+
+def bench_food_placement(fill_ratios=FILL_RATIOS, placements=PLACEMENTS):
+    """Time generate_food() on boards filled to increasing ratios"""
+    results = []
+    width, height = 64, 64
+    for ratio in fill_ratios:
+        engine = SnakeEngine(width, height)
+        length = int(width * height * ratio)
+        # Serpentine snake filling the first rows of the board
+        cells = [(x if y % 2 == 0 else width - 1 - x, y) for y in range(height) for x in range(width)]
+        engine.set_snake(cells[:length][::-1])
+
+        start = time.perf_counter()
+        for _ in range(placements):
+            x, y = engine.generate_food()
+            engine._release_cell(y * width + x)
+        elapsed = time.perf_counter() - start
+        results.append((ratio, elapsed / placements * 1e6))
+    return results
+
+
+def main():
+    print(f"{'length':>8}  {'us/tick':>8}")
+    for length, us_per_tick in bench_tick_vs_length():
+        print(f"{length:>8}  {us_per_tick:>8.2f}")
+    print()
+    print(f"{'fill':>8}  {'us/food':>8}")
+    for ratio, us_per_food in bench_food_placement():
+        print(f"{ratio:>8.2f}  {us_per_food:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Top-K high score tables.
+
+A Leaderboard keeps the best `capacity` scores for one difficulty in a
+min-heap whose root is the entry that would drop out next. Adding a score
+costs O(log K), and checking whether a score qualifies or reading the best
+score is O(1), so the game can ask every frame without rescanning the list.
+"""
+import heapq
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_CAPACITY = 10000
+
+
+class Leaderboard:
+    """The best scores for one difficulty, oldest first among equal scores"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, entries: Iterable[Dict[str, Any]] = ()):
+        self.capacity = capacity
+        # (score, -sequence, entry): the root is the lowest score, and the
+        # newest of those, matching a stable sort followed by truncation
+        self._heap: List[Tuple[int, int, Dict[str, Any]]] = []
+        self._sequence = 0
+        self._best: Optional[Dict[str, Any]] = None
+        self._sorted: Optional[List[Dict[str, Any]]] = None
+        self.version = 0  # Bumped on every change, for caches built from the entries
+        for entry in entries:
+            self.add(entry)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def qualifies(self, score: int) -> bool:
+        """Return True if score would make it onto the board"""
+        return len(self._heap) < self.capacity or bool(self._heap) and score > self._heap[0][0]
+
+    def in_top(self, score: int, n: int) -> bool:
+        """Return True if score would rank among the best n entries"""
+        if len(self._heap) < n:
+            return True
+        return score > self.entries()[n - 1]['score']
+
+    @property
+    def best(self) -> Optional[Dict[str, Any]]:
+        """The top entry, or None if the board is empty"""
+        return self._best
+
+    @property
+    def best_score(self) -> int:
+        """The top score, or 0 if the board is empty"""
+        return self._best['score'] if self._best else 0
+
+    def add(self, entry: Dict[str, Any]) -> bool:
+        """Insert an entry with 'name', 'score' and 'date' keys; return False if it did not qualify"""
+        score = entry['score']
+        if not self.qualifies(score):
+            return False
+        item = (score, -self._sequence, entry)
+        self._sequence += 1
+        if len(self._heap) < self.capacity:
+            heapq.heappush(self._heap, item)
+        else:
+            heapq.heapreplace(self._heap, item)
+        if self._best is None or score > self._best['score']:
+            self._best = entry
+        self._sorted = None
+        self.version += 1
+        return True
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """All entries, best first; the list is cached until the next add"""
+        if self._sorted is None:
+            self._sorted = [entry for _, _, entry in sorted(self._heap, key=lambda item: (-item[0], -item[1]))]
+        return self._sorted
@@ -0,0 +1,167 @@
+"""Caches for fonts and pre-rendered pygame surfaces used by snake_game.py"""
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pygame
+
+
+class LayoutCache:
+    """A pre-rendered surface (or table) that is rebuilt whenever its layout key changes
+
+    render is called with the key's values, so the key lists every input
+    that affects the result (sizes, grid dimensions, ...).
+    """
+
+    def __init__(self, render: Callable[..., Any]):
+        self.render = render
+        self.key: Optional[Tuple[Any, ...]] = None
+        self.value: Any = None
+        self.builds = 0
+
+    def get(self, *key) -> Any:
+        """Return the value for key, rendering it first if the key changed"""
+        if self.value is None or key != self.key:
+            self.value = self.render(*key)
+            self.key = key
+            self.builds += 1
+        return self.value
+
+    def invalidate(self):
+        """Drop the value so the next get() renders it again"""
+        self.value = None
+
+
+class TextCache:
+    """Bounded LRU cache of rendered text surfaces
+
+    Surfaces are keyed by (font, text, color, antialias), so HUD strings and
+    titles are rendered once and re-rendered only when their text changes.
+    Returned surfaces are shared and must not be drawn on.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._surfaces: 'OrderedDict[Tuple[Any, ...], pygame.Surface]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font: pygame.font.Font, text: str, antialias: bool, color) -> pygame.Surface:
+        """Drop-in replacement for font.render(text, antialias, color)"""
+        key = (font, text, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """Forget every cached surface (counters are kept)"""
+        self._surfaces.clear()
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+
+class FontRegistry:
+    """Process-wide registry that resolves each (family, size, bold) font once
+
+    pygame.font.SysFont scans the system fonts to find a file for a family.
+    The registry does that lookup once per (family, bold), keeps the loaded
+    Font objects, and can persist the resolved file paths to cache_path so
+    later startups load the files directly and skip the scan.
+    """
+
+    def __init__(self, cache_path: Optional[str] = None):
+        self.cache_path = cache_path
+        self._fonts: Dict[Tuple[str, int, bool], pygame.font.Font] = {}
+        # "family|bold" -> [font file or None for pygame's default font, needs synthetic bold]
+        self._paths: Dict[str, list] = {}
+        self._dirty = False
+        self._load_paths()
+
+    def _load_paths(self):
+        """Load previously resolved font paths, ignoring files that have gone
+
+        Families that resolved to no file are looked up again, in case the
+        font has been installed (or fc-list become available) since.
+        """
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r') as f:
+                paths = json.load(f)
+        except Exception as e:
+            print(f"Error loading font cache: {e}")
+            return
+        for key, (path, fake_bold) in paths.items():
+            if path is not None and os.path.exists(path):
+                self._paths[key] = [path, fake_bold]
+
+    def _resolve(self, family: str, bold: bool) -> list:
+        """Find the font file for a family the way SysFont does, scanning system fonts"""
+        key = f'{family.lower()}|{int(bold)}'
+        if key not in self._paths:
+            path = pygame.font.match_font(family, bold=bold)
+            # match_font falls back to the regular face when there is no bold one
+            fake_bold = bold and (path is None or path == pygame.font.match_font(family))
+            self._paths[key] = [path, fake_bold]
+            self._dirty = True
+        return self._paths[key]
+
+    def get(self, family: str, size: int, bold: bool = False) -> pygame.font.Font:
+        """Return the shared Font for family, size and weight, loading it on first use"""
+        key = (family.lower(), size, bold)
+        font = self._fonts.get(key)
+        if font is None:
+            path, fake_bold = self._resolve(family, bold)
+            font = pygame.font.Font(path, size)
+            if fake_bold:
+                font.set_bold(True)
+            self._fonts[key] = font
+        return font
+
+    def save(self):
+        """Persist resolved font paths if any were added since the last save"""
+        if not self.cache_path or not self._dirty:
+            return
+        try:
+            # Written aside and swapped in, so a crash never leaves a torn cache
+            temp_path = self.cache_path + '.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump(self._paths, f)
+            os.replace(temp_path, self.cache_path)
+            self._dirty = False
+        except Exception as e:
+            print(f"Error saving font cache: {e}")
+
+
+class SpriteAtlas:
+    """Cell-sized sprites for one grid size, drawn once and blitted every frame"""
+
+    def __init__(self, cell_size: int):
+        self.cell_size = cell_size
+        self.heads: Dict[Any, pygame.Surface] = {}  # Keyed by the direction the head faces
+        self.bodies: List[pygame.Surface] = []  # Indexed by segment position, last shade repeats
+        self.food: Optional[pygame.Surface] = None
+        self.special_food: List[pygame.Surface] = []  # Indexed by pulse size
+
+    def new_sprite(self) -> pygame.Surface:
+        """Return a blank, fully transparent cell-sized surface"""
+        sprite = pygame.Surface((self.cell_size, self.cell_size), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+            sprite.fill((0, 0, 0, 0))
+        return sprite
+
+    def body(self, index: int) -> pygame.Surface:
+        """Sprite for the body segment at index (1 is the segment behind the head)"""
+        return self.bodies[min(index, len(self.bodies) - 1)]
@@ -0,0 +1,261 @@
+"""Compact binary replays of Snake games, and a headless player to verify them.
+
+A game is fully determined by its seed and the direction handed to
+SnakeEngine.step() on each tick, so a replay stores just those. The file
+layout is:
+
+    header   MAGIC, VERSION byte, then varints: seed, difficulty index,
+             rules index, grid width, grid height
+    records  one varint per turn: (tick delta << 3) | direction index
+    footer   an END record whose tick delta reaches the final tick, then
+             varints for the score and the CRC-32 of everything before it
+
+All varints are unsigned LEB128. Records are written only when the
+direction changes, so an hour of play is a few kilobytes, and the player
+re-simulates it with no display at full engine speed.
+
+Run with: python replay.py replays/*.snr
+"""
+import argparse
+import os
+import time
+import zlib
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from snake_engine import DIRECTION_INDEX, Difficulty, Direction, Rules, SnakeEngine, grid_dimensions
+
+MAGIC = b'SNKR'
+VERSION = 1
+REPLAY_SUFFIX = '.snr'
+DIRECTION_BITS = 3  # Low bits of a record hold the direction index
+_END = (1 << DIRECTION_BITS) - 1  # Direction index of the footer record
+GAME_RULES = Rules.WRAP  # The rule set snake_game.py plays, and so the only one verified
+MAX_REPLAY_SECONDS = 6 * 60 * 60  # Longer claimed games are rejected without simulating them
+
+_DIRECTIONS = list(Direction)
+_DIFFICULTIES = list(Difficulty)
+_RULES = list(Rules)
+
+
+class ReplayError(ValueError):
+    """A replay file is truncated, corrupt or of an unknown version"""
+
+
+def _write_varint(out: bytearray, value: int):
+    """Append value to out as an unsigned LEB128 varint"""
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """Return the varint at data[pos] and the position after it"""
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ReplayError('replay ends in the middle of a number')
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Replay(NamedTuple):
+    """A decoded replay: how the game was set up, every turn, and how it ended"""
+    seed: int
+    difficulty: Difficulty
+    rules: Rules
+    grid_width: int
+    grid_height: int
+    turns: List[Tuple[int, Direction]]  # (tick, direction handed to step() from that tick on)
+    final_tick: int
+    score: int
+
+    def new_engine(self) -> SnakeEngine:
+        """A fresh engine in the state the recorded game started from"""
+        return SnakeEngine(self.grid_width, self.grid_height, self.difficulty.value['score_multiplier'],
+                           self.seed, self.rules, self.difficulty.value['speed'])
+
+    @property
+    def duration(self) -> float:
+        """Seconds of game time the replay covers"""
+        return self.final_tick / self.difficulty.value['speed']
+
+
+class ReplayRecorder:
+    """Builds the replay of one game as the front end plays it
+
+    Call record() with the tick number and direction before every
+    engine.step(), and finish() once the game ends (or is abandoned).
+    """
+
+    def __init__(self, seed: int, difficulty: Difficulty, rules: Rules,
+                 grid_width: int, grid_height: int, direction: Direction = Direction.RIGHT):
+        self._data = bytearray(MAGIC)
+        self._data.append(VERSION)
+        for value in (seed, _DIFFICULTIES.index(difficulty), _RULES.index(rules), grid_width, grid_height):
+            _write_varint(self._data, value)
+        self._direction = direction  # The engine starts facing this way
+        self._tick = 0  # Tick of the last record
+
+    def record(self, tick: int, direction: Optional[Direction]):
+        """Note the direction handed to step() on tick; only changes are stored"""
+        if direction is None or direction is self._direction:
+            return
+        _write_varint(self._data, (tick - self._tick) << DIRECTION_BITS | DIRECTION_INDEX[direction])
+        self._direction = direction
+        self._tick = tick
+
+    def finish(self, final_tick: int, score: int) -> bytes:
+        """Return the complete replay for a game that stopped after final_tick ticks"""
+        data = bytearray(self._data)
+        _write_varint(data, (final_tick - self._tick) << DIRECTION_BITS | _END)
+        _write_varint(data, score)
+        _write_varint(data, zlib.crc32(data))
+        return bytes(data)
+
+
+def parse_replay(data: bytes) -> Replay:
+    """Decode a replay, raising ReplayError if it is damaged"""
+    if data[:len(MAGIC)] != MAGIC:
+        raise ReplayError('not a Snake replay')
+    if len(data) <= len(MAGIC) or data[len(MAGIC)] != VERSION:
+        raise ReplayError('unsupported replay version')
+
+    pos = len(MAGIC) + 1
+    header = []
+    for _ in range(5):
+        value, pos = _read_varint(data, pos)
+        header.append(value)
+    seed, difficulty_index, rules_index, grid_width, grid_height = header
+    if difficulty_index >= len(_DIFFICULTIES) or rules_index >= len(_RULES):
+        raise ReplayError('unknown difficulty or rule set')
+
+    turns = []
+    tick = 0
+    while True:
+        value, pos = _read_varint(data, pos)
+        tick += value >> DIRECTION_BITS
+        direction_index = value & _END
+        if direction_index == _END:
+            break
+        if direction_index >= len(_DIRECTIONS):
+            raise ReplayError('unknown direction')
+        turns.append((tick, _DIRECTIONS[direction_index]))
+
+    score, pos = _read_varint(data, pos)
+    checksum, end = _read_varint(data, pos)
+    if checksum != zlib.crc32(data[:pos]) or end != len(data):
+        raise ReplayError('replay checksum does not match')
+    return Replay(seed, _DIFFICULTIES[difficulty_index], _RULES[rules_index],
+                  grid_width, grid_height, turns, tick, score)
+
+
+def load_replay(path: str) -> Replay:
+    """Read and decode a replay file"""
+    with open(path, 'rb') as f:
+        return parse_replay(f.read())
+
+
+def replay_file_name(seed: int, difficulty: Difficulty) -> str:
+    """A unique, sortable file name for a replay recorded now"""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{difficulty.name.lower()}-{seed:016x}{REPLAY_SUFFIX}"
+
+
+def play_replay(replay: Replay) -> SnakeEngine:
+    """Re-simulate a replay headlessly and return the engine after its final tick
+
+    Like the front end, every tick hands step() the latest direction, so
+    turns the engine rejected are rejected again the same way.
+    """
+    engine = replay.new_engine()
+    step = engine.step
+    direction = Direction.RIGHT
+    for tick, turn in replay.turns:
+        if tick > replay.final_tick:
+            break
+        while engine.ticks < tick and not engine.game_over:
+            step(direction)
+        direction = turn
+    while engine.ticks < replay.final_tick and not engine.game_over:
+        step(direction)
+    return engine
+
+
+class ReplayVerdict(NamedTuple):
+    """Outcome of re-simulating a replay"""
+    valid: bool
+    claimed_score: int
+    score: int  # What the re-simulation scored
+    ticks: int
+    reason: str = ''
+
+
+def verify_replay(data: bytes) -> ReplayVerdict:
+    """Check that a replay, played back, reaches the tick and score it claims"""
+    try:
+        replay = parse_replay(data)
+    except ReplayError as e:
+        return ReplayVerdict(False, 0, 0, 0, str(e))
+
+    # The header is as untrusted as the rest: a bigger board or other rules
+    # would make impossible scores reproducible
+    if (replay.grid_width, replay.grid_height) != grid_dimensions(replay.difficulty):
+        return ReplayVerdict(False, replay.score, 0, 0,
+                             f'board {replay.grid_width}x{replay.grid_height} does not match the difficulty')
+    if replay.rules != GAME_RULES:
+        return ReplayVerdict(False, replay.score, 0, 0, f'rule set {replay.rules.value} is not the game\'s')
+    if replay.duration > MAX_REPLAY_SECONDS:
+        return ReplayVerdict(False, replay.score, 0, 0, f'game of {replay.final_tick} ticks is too long')
+    if any(tick > replay.final_tick for tick, _ in replay.turns):
+        return ReplayVerdict(False, replay.score, 0, 0, 'turns recorded after the final tick')
+    try:
+        engine = play_replay(replay)
+    except Exception as e:
+        return ReplayVerdict(False, replay.score, 0, 0, f'replay could not be played: {e!r}')
+    if engine.ticks != replay.final_tick:
+        return ReplayVerdict(False, replay.score, engine.score, engine.ticks,
+                             f'game ended at tick {engine.ticks}, replay claims {replay.final_tick}')
+    if engine.score != replay.score:
+        return ReplayVerdict(False, replay.score, engine.score, engine.ticks,
+                             f'score {engine.score} does not match claimed {replay.score}')
+    return ReplayVerdict(True, replay.score, engine.score, engine.ticks)
+
+
+def iter_replay_files(paths: List[str]) -> Iterator[str]:
+    """Expand directories among paths into the replay files they contain"""
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(REPLAY_SUFFIX):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-simulate Snake replays and check their scores')
+    parser.add_argument('paths', nargs='+', help='replay files or directories of them')
+    args = parser.parse_args()
+
+    game_time = 0.0
+    start = time.perf_counter()
+    for path in iter_replay_files(args.paths):
+        with open(path, 'rb') as f:
+            data = f.read()
+        verdict = verify_replay(data)
+        status = 'ok' if verdict.valid else f'REJECTED ({verdict.reason})'
+        print(f"{path}: {len(data)} bytes, {verdict.ticks} ticks, score {verdict.claimed_score}: {status}")
+        if verdict.valid:
+            game_time += parse_replay(data).duration
+    elapsed = time.perf_counter() - start
+    if elapsed > 0:
+        print(f"{game_time:.1f}s of play verified in {elapsed:.3f}s ({game_time / elapsed:.0f}x real time)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Run many headless Snake games across all CPU cores.
+
+Games are split into shards that run in a concurrent.futures process pool.
+Every game gets its own seed derived from the run seed, so a run is
+reproducible regardless of how shards land on workers. Shards play their
+games with a simple food-seeking bot and send back aggregate statistics,
+which are merged per difficulty as shards finish.
+
+Run with: python rollout.py --games 10000 --workers 64
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from snake_engine import Difficulty, Direction, OPPOSITE, SnakeEngine
+
+DEFAULT_SHARD_SIZE = 50
+DEFAULT_MAX_TICKS = 20000  # Stop bots that circle forever
+
+
+def greedy_policy(engine: SnakeEngine) -> Direction:
+    """Head towards the food, avoiding moves into the snake when possible"""
+    head_x, head_y = engine.snake[0]
+    target = engine.food or engine.snake[0]
+    preferred = []
+    if target[0] > head_x:
+        preferred.append(Direction.RIGHT)
+    elif target[0] < head_x:
+        preferred.append(Direction.LEFT)
+    if target[1] > head_y:
+        preferred.append(Direction.DOWN)
+    elif target[1] < head_y:
+        preferred.append(Direction.UP)
+    candidates = preferred + [engine.direction, Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT]
+
+    for direction in candidates:
+        if direction == OPPOSITE[engine.direction]:
+            continue
+        dx, dy = direction.value
+        cell = ((head_x + dx) % engine.grid_width, (head_y + dy) % engine.grid_height)
+        if engine.is_free(cell):
+            return direction
+    return engine.direction
+
+
+def play_game(difficulty: Difficulty, max_ticks: int = DEFAULT_MAX_TICKS,
+              seed: Optional[int] = None) -> Tuple[int, int, int]:
+    """Play one game with greedy_policy and return (score, length, ticks)"""
+    engine = SnakeEngine.for_difficulty(difficulty, seed=seed)
+    while not engine.game_over and engine.ticks < max_ticks:
+        engine.step(greedy_policy(engine))
+    return engine.score, len(engine.snake), engine.ticks
+
+
+@dataclass
+class RolloutStats:
+    """Aggregate results for one difficulty"""
+    games: int = 0
+    total_score: int = 0
+    max_score: int = 0
+    total_length: int = 0
+    max_length: int = 0
+    total_ticks: int = 0
+
+    def add_game(self, score: int, length: int, ticks: int):
+        self.games += 1
+        self.total_score += score
+        self.max_score = max(self.max_score, score)
+        self.total_length += length
+        self.max_length = max(self.max_length, length)
+        self.total_ticks += ticks
+
+    def merge(self, other: 'RolloutStats'):
+        self.games += other.games
+        self.total_score += other.total_score
+        self.max_score = max(self.max_score, other.max_score)
+        self.total_length += other.total_length
+        self.max_length = max(self.max_length, other.max_length)
+        self.total_ticks += other.total_ticks
+
+    @property
+    def mean_score(self) -> float:
+        return self.total_score / self.games if self.games else 0.0
+
+    @property
+    def mean_length(self) -> float:
+        return self.total_length / self.games if self.games else 0.0
+
+    @property
+    def mean_ticks(self) -> float:
+        return self.total_ticks / self.games if self.games else 0.0
+
+
+def game_seed(run_seed: int, difficulty: Difficulty, game_index: int) -> int:
+    """Seed for one game of a run, independent of sharding"""
+    difficulty_index = list(Difficulty).index(difficulty)
+    return (run_seed * len(Difficulty) + difficulty_index) * 1_000_000_007 + game_index
+
+
+def run_shard(difficulty_name: str, first_game: int, num_games: int, run_seed: int,
+              max_ticks: int = DEFAULT_MAX_TICKS) -> Tuple[str, RolloutStats]:
+    """Play games first_game .. first_game + num_games - 1 in a worker process"""
+    difficulty = Difficulty[difficulty_name]
+    stats = RolloutStats()
+    for game_index in range(first_game, first_game + num_games):
+        stats.add_game(*play_game(difficulty, max_ticks, game_seed(run_seed, difficulty, game_index)))
+    return difficulty_name, stats
+
+
+@dataclass
+class RolloutReport:
+    """Merged results of a rollout run"""
+    stats: Dict[str, RolloutStats] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def games(self) -> int:
+        return sum(s.games for s in self.stats.values())
+
+    @property
+    def games_per_second(self) -> float:
+        return self.games / self.elapsed if self.elapsed else 0.0
+
+
+def run_rollouts(games: int, difficulties: Optional[List[Difficulty]] = None,
+                 workers: Optional[int] = None, shard_size: int = DEFAULT_SHARD_SIZE,
+                 seed: int = 0, max_ticks: int = DEFAULT_MAX_TICKS,
+                 progress=None) -> RolloutReport:
+    """Play games per difficulty across a process pool and merge the results
+
+    progress, if given, is called with the report after every finished shard.
+    """
+    difficulties = difficulties or list(Difficulty)
+    workers = workers or os.cpu_count() or 1
+    report = RolloutReport(stats={d.name: RolloutStats() for d in difficulties})
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for difficulty in difficulties:
+            for first in range(0, games, shard_size):
+                count = min(shard_size, games - first)
+                futures.append(executor.submit(run_shard, difficulty.name, first, count, seed, max_ticks))
+
+        for future in as_completed(futures):
+            difficulty_name, stats = future.result()
+            report.stats[difficulty_name].merge(stats)
+            report.elapsed = time.perf_counter() - start
+            if progress:
+                progress(report)
+
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run headless Snake games on all cores')
+    parser.add_argument('--games', type=int, default=1000, help='games per difficulty')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--difficulty', choices=[d.name for d in Difficulty], action='append',
+                        help='difficulty to play (repeatable, default: all)')
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-ticks', type=int, default=DEFAULT_MAX_TICKS)
+    args = parser.parse_args()
+
+    difficulties = [Difficulty[name] for name in args.difficulty] if args.difficulty else None
+    report = run_rollouts(args.games, difficulties, args.workers, args.shard_size, args.seed, args.max_ticks)
+
+    print(f"{'difficulty':<10} {'games':>8} {'mean score':>11} {'max score':>10} "
+          f"{'mean len':>9} {'mean ticks':>11}")
+    for name, stats in report.stats.items():
+        print(f"{name:<10} {stats.games:>8} {stats.mean_score:>11.1f} {stats.max_score:>10} "
+              f"{stats.mean_length:>9.1f} {stats.mean_ticks:>11.1f}")
+    print(f"{report.games} games in {report.elapsed:.2f}s ({report.games_per_second:.1f} games/sec)")
+
+
+if __name__ == "__main__":
+    main()
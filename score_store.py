@@ -0,0 +1,466 @@
+"""Crash-safe storage for high scores.
+
+JournalStore keeps the high score tables as a JSON snapshot plus an
+append-only journal with one compact record per new score. Adding a score
+appends and fsyncs a single line, so it costs the same however big the
+tables are. Every COMPACT_EVERY records the tables are folded into a new
+snapshot, written to a temporary file and swapped in with os.replace.
+
+The snapshot and the journal both carry a generation number. Compaction
+writes the snapshot with the next generation and then starts a new journal
+for it, so a crash between the two steps leaves an old journal that load()
+recognises and skips instead of replaying twice. A crash while appending
+can leave a torn last line, which load() drops.
+
+SqliteStore offers the same load/append/compact surface on top of a SQLite
+database, for tables too big to keep as JSON, and adds rank, top N and
+percentile queries.
+
+ScoreWriter runs a store's writes on a background thread, so the game never
+waits on the disk. It also writes the game's other files, such as replays.
+"""
+import copy
+import json
+import os
+import queue
+import sqlite3
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from leaderboard import DEFAULT_CAPACITY
+
+COMPACT_EVERY = 1000  # Journal records between snapshots
+SCORE_TREE_SIZE = 1 << 31  # Scores from 0 up to this are ranked by SqliteStore
+WRITE_QUEUE_SIZE = 256  # Pending writes before ScoreWriter.append blocks
+
+Tables = Dict[str, List[Dict[str, Any]]]  # Difficulty name -> entries
+
+
+def _fsync_directory(path: str):
+    """Make a rename inside path's directory durable, where the OS allows it"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return  # Directories cannot be opened on Windows
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_atomic(path: str, data: bytes):
+    """Replace path with data so readers see either the old or the new file"""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    _fsync_directory(path)
+
+
+class JournalStore:
+    """High scores stored as a snapshot file plus an append-only journal"""
+
+    def __init__(self, snapshot_path: str, journal_path: str, compact_every: int = COMPACT_EVERY):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.compact_every = compact_every
+        self.generation = 0
+        self.journal_records = 0
+        self._journal = None  # Append handle, opened by load()
+
+    @property
+    def should_compact(self) -> bool:
+        """True once the journal has grown enough to fold into a new snapshot"""
+        return self.journal_records >= self.compact_every
+
+    def load(self, defaults: Tables) -> Tables:
+        """Return the snapshot (or a copy of defaults) with the journal replayed on top"""
+        tables, self.generation = self._read_snapshot(defaults)
+        journal_generation, records, valid_size = self._read_journal()
+        self.journal_records = 0
+        if journal_generation is not None and journal_generation >= self.generation:
+            for difficulty, entry in records:
+                tables.setdefault(difficulty, []).append(entry)
+            self.journal_records = len(records)
+            self.generation = journal_generation
+        elif journal_generation is not None:
+            # Already folded into the snapshot by a compaction that was cut short
+            valid_size = None
+        self._open_journal(valid_size)
+        return tables
+
+    def _read_snapshot(self, defaults: Tables) -> Tuple[Tables, int]:
+        """Read the snapshot, accepting the older plain {difficulty: entries} format
+
+        A snapshot that does not parse (e.g. a legacy file torn by a crash
+        mid-write) is renamed to *.corrupt and the tables start from
+        defaults, so the journal still opens and new scores are saved.
+        """
+        if not os.path.exists(self.snapshot_path):
+            return copy.deepcopy(defaults), 0
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+            if not isinstance(snapshot, dict):
+                raise ValueError('snapshot is not a JSON object')
+        except ValueError as e:
+            print(f"Error loading high scores: {e}")
+            os.replace(self.snapshot_path, self.snapshot_path + '.corrupt')
+            return copy.deepcopy(defaults), 0
+        if 'scores' in snapshot and 'generation' in snapshot:
+            return snapshot['scores'], snapshot['generation']
+        return snapshot, 0
+
+    def _read_journal(self):
+        """Return (generation, [(difficulty, entry)], bytes of whole records) for the journal
+
+        The generation is None when there is no usable journal. Reading stops
+        at the first line that is incomplete or does not parse.
+        """
+        if not os.path.exists(self.journal_path):
+            return None, [], None
+        with open(self.journal_path, 'rb') as f:
+            data = f.read()
+
+        generation = None
+        records = []
+        valid_size = 0
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b'\n'):
+                break  # Torn write
+            try:
+                record = json.loads(line)
+                if generation is None:
+                    generation = record['generation']
+                else:
+                    difficulty, name, score, date = record
+                    records.append((difficulty, {"name": name, "score": score, "date": date}))
+            except (ValueError, KeyError, TypeError):
+                break
+            valid_size += len(line)
+        return generation, records, valid_size
+
+    def _open_journal(self, valid_size):
+        """Open the journal for appending, trimming a torn tail or starting a new one"""
+        self.close()
+        if valid_size:
+            if valid_size < os.path.getsize(self.journal_path):
+                os.truncate(self.journal_path, valid_size)
+        else:
+            self._start_journal()
+        self._journal = open(self.journal_path, 'ab')
+
+    def _start_journal(self):
+        """Atomically replace the journal with an empty one for the current generation"""
+        header = json.dumps({'generation': self.generation}) + '\n'
+        _write_atomic(self.journal_path, header.encode('utf-8'))
+        self.journal_records = 0
+
+    def append(self, difficulty: str, entry: Dict[str, Any]):
+        """Durably record one new score"""
+        self.append_many([(difficulty, entry)])
+
+    def append_many(self, records: List[Tuple[str, Dict[str, Any]]]):
+        """Durably record many (difficulty, entry) scores with one write and fsync"""
+        if self._journal is None:
+            raise RuntimeError('load() must be called before append()')
+        lines = [json.dumps([difficulty, entry['name'], entry['score'], entry['date']], separators=(',', ':'))
+                 for difficulty, entry in records]
+        self._journal.write(''.join(line + '\n' for line in lines).encode('utf-8'))
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self.journal_records += len(records)
+
+    def compact(self, tables: Tables):
+        """Write tables as the next snapshot and start an empty journal"""
+        snapshot = {'generation': self.generation + 1, 'scores': tables}
+        _write_atomic(self.snapshot_path, json.dumps(snapshot, separators=(',', ':')).encode('utf-8'))
+        self.generation += 1
+        self.close()
+        self._start_journal()
+        self._journal = open(self.journal_path, 'ab')
+
+    def close(self):
+        """Close the journal file handle"""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+
+class SqliteStore:
+    """High scores stored in a local SQLite database
+
+    Every score ever added is kept in the scores table, indexed by
+    (difficulty, score), so top N is an index range read. score_tree is a
+    Fenwick tree of score counts per difficulty: an insert bumps, and a rank
+    or percentile query sums, at most log2(SCORE_TREE_SIZE) of its rows,
+    however many scores are stored. load() returns the same
+    {difficulty: entries} tables as JournalStore, trimmed to the best
+    load_limit entries per difficulty.
+
+    The connection may be used from any thread; a lock serialises access.
+    """
+
+    def __init__(self, db_path: str, json_snapshot: Optional[str] = None,
+                 json_journal: Optional[str] = None, load_limit: int = DEFAULT_CAPACITY):
+        self.db_path = db_path
+        self.json_snapshot = json_snapshot
+        self.json_journal = json_journal
+        self.load_limit = load_limit
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    @property
+    def should_compact(self) -> bool:
+        """SQLite writes in place, so there is never a journal to fold in"""
+        return False
+
+    def connect(self) -> sqlite3.Connection:
+        """Open the database, creating the schema on first use"""
+        if self._db is None:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            # In WAL mode NORMAL only risks the last commits on power loss,
+            # never corruption
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            with self._db:
+                self._db.executescript('''
+                    CREATE TABLE IF NOT EXISTS scores (
+                        id INTEGER PRIMARY KEY,
+                        difficulty TEXT NOT NULL,
+                        name TEXT NOT NULL,
+                        score INTEGER NOT NULL,
+                        date TEXT NOT NULL
+                    );
+                    CREATE INDEX IF NOT EXISTS scores_by_difficulty_score
+                        ON scores (difficulty, score DESC, id);
+                    CREATE TABLE IF NOT EXISTS score_tree (
+                        difficulty TEXT NOT NULL,
+                        node INTEGER NOT NULL,
+                        count INTEGER NOT NULL,
+                        PRIMARY KEY (difficulty, node)
+                    ) WITHOUT ROWID;
+                    CREATE TABLE IF NOT EXISTS meta (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL
+                    );
+                ''')
+        return self._db
+
+    def load(self, defaults: Tables) -> Tables:
+        """Return the best load_limit entries per difficulty
+
+        A new database is filled once from the JSON snapshot and journal if
+        they exist, or from defaults otherwise.
+        """
+        with self._lock:
+            db = self.connect()
+            if db.execute("SELECT 1 FROM meta WHERE key = 'initialized'").fetchone() is None:
+                self._initialize(defaults)
+            # The root node counts every score of a difficulty
+            difficulties = [row[0] for row in db.execute(
+                'SELECT difficulty FROM score_tree WHERE node = ?', (SCORE_TREE_SIZE,))]
+            return {difficulty: self.top(difficulty, self.load_limit) for difficulty in difficulties}
+
+    def _initialize(self, defaults: Tables):
+        """Import the JSON high scores (or defaults) into a new database, exactly once"""
+        tables = defaults
+        source = 'defaults'
+        if self.json_snapshot and os.path.exists(self.json_snapshot):
+            json_store = JournalStore(self.json_snapshot, self.json_journal or self.json_snapshot + '.journal')
+            tables = json_store.load(defaults)
+            json_store.close()
+            source = self.json_snapshot
+        records = [(difficulty, entry) for difficulty, entries in tables.items() for entry in entries]
+        with self._db:
+            self._insert(records)
+            self._db.execute("INSERT INTO meta (key, value) VALUES ('initialized', ?)", (source,))
+
+    def _insert(self, records: List[Tuple[str, Dict[str, Any]]]):
+        """Insert records and update score_tree; the caller owns the transaction"""
+        self._db.executemany(
+            'INSERT INTO scores (difficulty, name, score, date) VALUES (?, ?, ?, ?)',
+            [(difficulty, entry['name'], entry['score'], entry['date']) for difficulty, entry in records])
+
+        # Sum the tree updates of the whole batch so each node is written once
+        updates: Counter = Counter()
+        for difficulty, entry in records:
+            node = self._tree_index(entry['score'])
+            while node <= SCORE_TREE_SIZE:
+                updates[difficulty, node] += 1
+                node += node & -node
+        self._db.executemany(
+            'INSERT INTO score_tree (difficulty, node, count) VALUES (?, ?, ?) '
+            'ON CONFLICT (difficulty, node) DO UPDATE SET count = count + excluded.count',
+            [(difficulty, node, count) for (difficulty, node), count in updates.items()])
+
+    @staticmethod
+    def _tree_index(score: int) -> int:
+        """1-based score_tree position of a score, clamped to the tree's range"""
+        return min(max(score, 0), SCORE_TREE_SIZE - 1) + 1
+
+    def _count_up_to(self, difficulty: str, node: int) -> int:
+        """Number of scores at tree positions 1..node for a difficulty"""
+        nodes = []
+        while node > 0:
+            nodes.append(node)
+            node -= node & -node
+        with self._lock:
+            row = self.connect().execute(
+                f'SELECT SUM(count) FROM score_tree WHERE difficulty = ? AND node IN ({",".join("?" * len(nodes))})',
+                (difficulty, *nodes)).fetchone()
+        return row[0] or 0
+
+    def append(self, difficulty: str, entry: Dict[str, Any]):
+        """Record one new score"""
+        self.append_many([(difficulty, entry)])
+
+    def append_many(self, records: List[Tuple[str, Dict[str, Any]]]):
+        """Record many (difficulty, entry) scores in one transaction"""
+        with self._lock:
+            db = self.connect()
+            with db:
+                self._insert(records)
+
+    def compact(self, tables: Tables):
+        """Fold the write-ahead log back into the database file
+
+        The tables are already stored row by row, so they are not rewritten.
+        """
+        with self._lock:
+            self.connect().execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def top(self, difficulty: str, n: int) -> List[Dict[str, Any]]:
+        """The best n entries for a difficulty, oldest first among equal scores"""
+        with self._lock:
+            rows = self.connect().execute(
+                'SELECT name, score, date FROM scores WHERE difficulty = ? ORDER BY score DESC, id LIMIT ?',
+                (difficulty, n)).fetchall()
+        return [{"name": name, "score": score, "date": date} for name, score, date in rows]
+
+    def count(self, difficulty: str) -> int:
+        """How many scores are recorded for a difficulty"""
+        return self._count_up_to(difficulty, SCORE_TREE_SIZE)
+
+    def rank(self, difficulty: str, score: int) -> int:
+        """1-based position score would take on the board (ties share a rank)"""
+        with self._lock:
+            return self.count(difficulty) - self._count_up_to(difficulty, self._tree_index(score)) + 1
+
+    def percentile(self, difficulty: str, score: int) -> float:
+        """Percentage of recorded scores for a difficulty that are at or below score"""
+        with self._lock:
+            total = self.count(difficulty)
+            at_or_below = self._count_up_to(difficulty, self._tree_index(score))
+        return 100.0 * at_or_below / total if total else 100.0
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class ScoreWriter:
+    """Background thread that applies a store's writes in order
+
+    append() and compact() queue the write and return at once. The thread
+    drains whatever is queued, merges consecutive appends into one
+    append_many() call and keeps only the last of consecutive compactions,
+    so a burst of scores costs one disk write.
+    """
+
+    def __init__(self, store, max_pending: int = WRITE_QUEUE_SIZE):
+        self.store = store
+        self._queue: queue.Queue = queue.Queue(max_pending)
+        self._compaction_queued = False
+        self._thread = threading.Thread(target=self._run, name='score-writer', daemon=True)
+        self._thread.start()
+
+    @property
+    def should_compact(self) -> bool:
+        """True once the store wants its tables folded into a new snapshot and none is queued"""
+        return self.store.should_compact and not self._compaction_queued
+
+    def append(self, difficulty: str, entry: Dict[str, Any]):
+        """Queue one new score"""
+        self._queue.put(('append', (difficulty, entry)))
+
+    def compact(self, tables: Tables):
+        """Queue writing tables as a new snapshot; tables must not be changed afterwards"""
+        self._compaction_queued = True
+        self._queue.put(('compact', tables))
+
+    def write_file(self, path: str, data: bytes):
+        """Queue atomically writing data to path, creating its directory"""
+        self._queue.put(('file', (path, data)))
+
+    def flush(self):
+        """Block until every queued write has reached the store"""
+        self._queue.join()
+
+    def close(self):
+        """Flush, stop the thread and close the store"""
+        if self._thread.is_alive():
+            self._queue.put(('stop', None))
+            self._thread.join()
+        self.store.close()
+
+    def _run(self):
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = []
+            tables = None
+            for kind, payload in batch:
+                if kind == 'append':
+                    if tables is not None:
+                        self._write(records, tables)
+                        records, tables = [], None
+                    records.append(payload)
+                elif kind == 'compact':
+                    # Later snapshots include everything earlier ones did
+                    tables = payload
+                elif kind == 'file':
+                    self._write(records, tables)
+                    records, tables = [], None
+                    self._write_file(*payload)
+                else:
+                    running = False
+            self._write(records, tables)
+
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write_file(self, path: str, data: bytes):
+        """Write one queued file, reporting rather than raising errors"""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            _write_atomic(path, data)
+        except Exception as e:
+            print(f"Error saving {path}: {e}")
+
+    def _write(self, records: List[Tuple[str, Dict[str, Any]]], tables: Optional[Tables]):
+        """Apply merged appends, then a compaction, reporting rather than raising errors"""
+        try:
+            if records:
+                self.store.append_many(records)
+            if tables is not None:
+                self.store.compact(tables)
+        except Exception as e:
+            print(f"Error saving high scores: {e}")
+        finally:
+            if tables is not None:
+                self._compaction_queued = False
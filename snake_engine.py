@@ -0,0 +1,579 @@
+"""Headless Snake rules engine.
+
+Holds everything needed to play a game of Snake without a display: the snake
+body, food, special food, score and direction. The pygame front end in
+snake_game.py renders this state; bots and CI drive it directly via step().
+"""
+import random
+from array import array
+from collections.abc import Sequence
+from enum import Enum
+from functools import lru_cache
+from typing import Iterator, List, Tuple, Optional, NamedTuple
+
+# Difficulty levels
+class Difficulty(Enum):
+    EASY = {"name": "Easy", "speed": 8, "grid_size": 24, "score_multiplier": 1}
+    MEDIUM = {"name": "Medium", "speed": 12, "grid_size": 20, "score_multiplier": 2}
+    HARD = {"name": "Hard", "speed": 18, "grid_size": 16, "score_multiplier": 3}
+
+# Directions
+class Direction(Enum):
+    UP = (0, -1)
+    DOWN = (0, 1)
+    LEFT = (-1, 0)
+    RIGHT = (1, 0)
+    NONE = (0, 0)  # For when the game is not moving
+
+OPPOSITE = {
+    Direction.UP: Direction.DOWN,
+    Direction.DOWN: Direction.UP,
+    Direction.LEFT: Direction.RIGHT,
+    Direction.RIGHT: Direction.LEFT,
+    Direction.NONE: Direction.NONE,
+}
+
+# Position of each direction in the neighbour tables
+DIRECTION_INDEX = {direction: i for i, direction in enumerate(Direction)}
+
+# Rule sets for moving off the board
+class Rules(Enum):
+    WRAP = 'wrap'  # Come back on the opposite edge, as in snake_game.py
+    WALLS = 'walls'  # Die at the edge, as in snake_game copy1.py
+
+WALL = -1  # Neighbour of an edge cell under Rules.WALLS
+NO_CELL = -1  # Marks absent food or special food
+
+SPECIAL_FOOD_CHANCE = 0.2  # Rolled on eating, then again in generate_special_food
+SPECIAL_FOOD_POINTS = 10
+SPECIAL_FOOD_LIFETIME = 10  # Seconds of game time before uneaten special food disappears
+FOOD_RELOCATE_MOVES = 100  # Move food if not eaten within this many moves
+DEFAULT_SPEED = Difficulty.MEDIUM.value['speed']  # Moves per second of game time
+DEFAULT_WINDOW_SIZE = (1024, 768)  # Window the interactive game opens with
+
+
+def grid_dimensions(difficulty: 'Difficulty', window_size: Tuple[int, int] = DEFAULT_WINDOW_SIZE) -> Tuple[int, int]:
+    """Return the board size in cells for a difficulty and window size"""
+    grid_size = difficulty.value['grid_size']
+    grid_width = (window_size[0] - 400) // grid_size  # Leave space for UI
+    grid_height = (window_size[1] - 100) // grid_size
+    return grid_width, grid_height
+
+
+@lru_cache(maxsize=None)
+def neighbour_tables(grid_width: int, grid_height: int, rules: Rules = Rules.WRAP) -> Tuple[array, ...]:
+    """Return tables where tables[DIRECTION_INDEX[d]][cell] is the cell one step from cell in direction d
+
+    Cells are flat indices (y * grid_width + x); a step off the board gives
+    WALL under Rules.WALLS. The tables are built once per board size and
+    rule set and shared between engines, so they must not be modified.
+    """
+    tables = []
+    for direction in Direction:
+        dx, dy = direction.value
+        table = array('i')
+        for y in range(grid_height):
+            for x in range(grid_width):
+                next_x, next_y = x + dx, y + dy
+                if rules == Rules.WRAP:
+                    table.append(next_y % grid_height * grid_width + next_x % grid_width)
+                elif 0 <= next_x < grid_width and 0 <= next_y < grid_height:
+                    table.append(next_y * grid_width + next_x)
+                else:
+                    table.append(WALL)
+        tables.append(table)
+    return tuple(tables)
+
+
+class StepResult(NamedTuple):
+    """What happened during a single engine step"""
+    ate_food: bool
+    ate_special: bool
+    died: bool
+    won: bool = False  # The snake filled the whole board
+
+
+class SnakeBody(Sequence):
+    """Read-only, head-first view of the snake stored in an engine's ring buffer
+
+    Segments are returned as (x, y) tuples so drawing code can treat the
+    view like the list it replaced; membership tests use the occupancy grid.
+    """
+
+    __slots__ = ('_engine',)
+
+    def __init__(self, engine: 'SnakeEngine'):
+        self._engine = engine
+
+    def __len__(self) -> int:
+        return self._engine._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        engine = self._engine
+        if index < 0:
+            index += engine._length
+        if not 0 <= index < engine._length:
+            raise IndexError('snake segment index out of range')
+        cell = engine._body[(engine._head - index) % len(engine._body)]
+        return (cell % engine.grid_width, cell // engine.grid_width)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        engine = self._engine
+        body = engine._body
+        capacity = len(body)
+        width = engine.grid_width
+        position = engine._head
+        for _ in range(engine._length):
+            cell = body[position]
+            yield (cell % width, cell // width)
+            position = position - 1 if position else capacity - 1
+
+    def cells(self) -> array:
+        """Flat cell indices (y * grid_width + x) of every segment, head first"""
+        engine = self._engine
+        body = engine._body
+        if not engine._length:
+            return array('I')
+        if engine._tail <= engine._head:
+            cells = body[engine._tail:engine._head + 1]
+        else:
+            cells = body[engine._tail:] + body[:engine._head + 1]
+        cells.reverse()
+        return cells
+
+    def __contains__(self, cell) -> bool:
+        x, y = cell
+        engine = self._engine
+        if not (0 <= x < engine.grid_width and 0 <= y < engine.grid_height):
+            return False
+        return not engine.is_free(cell)
+
+    def __repr__(self) -> str:
+        return f'SnakeBody({list(self)!r})'
+
+
+# Kinds of undo log entries written while a push() frame is open
+_UNDO_OCCUPIED, _UNDO_TAKE, _UNDO_RELEASE, _UNDO_BODY = range(4)
+
+
+class SnakeEngine:
+    """Game rules and state for one game of Snake, with no pygame dependency
+
+    Time is counted in moves (ticks), not read from a clock: at speed moves
+    per second, special food lasts SPECIAL_FOOD_LIFETIME * speed ticks. A
+    game plays out the same however fast or slow step() is called, and
+    stops aging while nobody calls it.
+
+    Search agents can branch from a state cheaply: clone() copies the few
+    arrays and scalars a game consists of, and push()/pop() undo any number
+    of step() calls in place by replaying a log of the cells they changed.
+    """
+
+    __slots__ = (
+        'grid_width', 'grid_height', 'score_multiplier', 'rules', 'speed', 'special_food_lifetime',
+        'rng', 'score', 'game_over', 'won', 'food_timer', 'ticks',
+        '_neighbours', '_direction', '_opposite', '_step_table',
+        '_food', '_special', '_special_spawn', '_special_points',
+        '_body', '_occupied', '_length', '_tail', '_head', '_view',
+        '_free', '_free_pos', '_free_count',
+        '_frames', '_log', '_rng_unsaved', '_rng_shared',
+    )
+
+    def __init__(self, grid_width: int, grid_height: int, score_multiplier: int = 1,
+                 seed: Optional[int] = None, rules: Rules = Rules.WRAP, speed: int = DEFAULT_SPEED):
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.score_multiplier = score_multiplier
+        self.rules = rules
+        self.speed = speed
+        self.special_food_lifetime = SPECIAL_FOOD_LIFETIME * speed  # In ticks
+        self._neighbours = neighbour_tables(grid_width, grid_height, rules)
+        # Every random decision in a game comes from this stream, so the same
+        # seed and inputs always replay the same game
+        self.rng = random.Random(seed)
+        self._rng_shared = False  # True while a clone may still use the same Random
+        # Undo frames opened by push(); _log is None while there are none
+        self._frames: List[list] = []
+        self._log: Optional[list] = None
+        self._rng_unsaved: List[list] = []  # Frames opened since the stream was last used
+        self.reset()
+
+    @classmethod
+    def for_difficulty(cls, difficulty: Difficulty,
+                       window_size: Tuple[int, int] = DEFAULT_WINDOW_SIZE,
+                       seed: Optional[int] = None, rules: Rules = Rules.WRAP) -> 'SnakeEngine':
+        """Create an engine with the board size and scoring of a difficulty level"""
+        grid_width, grid_height = grid_dimensions(difficulty, window_size)
+        return cls(grid_width, grid_height, difficulty.value['score_multiplier'], seed, rules,
+                   difficulty.value['speed'])
+
+    def reset(self, seed: Optional[int] = None):
+        """Reset the game state, reseeding the game's random stream if seed is given"""
+        if seed is not None:
+            self._random().seed(seed)
+        self.direction = Direction.RIGHT
+        # Food and special food are flat cell indices, NO_CELL when absent
+        self._food = NO_CELL
+        self._special = NO_CELL
+        self._special_spawn = 0  # Tick the special food appeared on
+        self._special_points = SPECIAL_FOOD_POINTS
+
+        head = (self.grid_width // 2, self.grid_height // 2)
+        self.set_snake([head, (head[0] - 1, head[1])])  # Head plus initial body segment
+
+        self._food = self._generate_cell()
+        self.score = 0
+        self.game_over = False
+        self.won = False
+        self.food_timer = 0
+        self.ticks = 0
+
+    @property
+    def direction(self) -> Direction:
+        """Direction the snake moves in on the next step"""
+        return self._direction
+
+    @direction.setter
+    def direction(self, direction: Direction):
+        self._direction = direction
+        self._opposite = OPPOSITE[direction]
+        self._step_table = self._neighbours[DIRECTION_INDEX[direction]]
+
+    @property
+    def food(self) -> Optional[Tuple[int, int]]:
+        """Position of the regular food, or None while the board is too full for it"""
+        if self._food == NO_CELL:
+            return None
+        return (self._food % self.grid_width, self._food // self.grid_width)
+
+    @food.setter
+    def food(self, cell: Optional[Tuple[int, int]]):
+        self._food = NO_CELL if cell is None else cell[1] * self.grid_width + cell[0]
+
+    @property
+    def special_food(self) -> Optional[Tuple[Tuple[int, int], int, int]]:
+        """(position, spawn_tick, points) of the bonus food, or None"""
+        if self._special == NO_CELL:
+            return None
+        position = (self._special % self.grid_width, self._special // self.grid_width)
+        return (position, self._special_spawn, self._special_points)
+
+    @special_food.setter
+    def special_food(self, special_food: Optional[Tuple[Tuple[int, int], int, int]]):
+        if special_food is None:
+            self._special = NO_CELL
+        else:
+            (x, y), self._special_spawn, self._special_points = special_food
+            self._special = y * self.grid_width + x
+
+    @property
+    def snake(self) -> SnakeBody:
+        """Head-first, read-only view of the snake body"""
+        return self._view
+
+    def set_snake(self, segments: List[Tuple[int, int]]):
+        """Replace the snake body (head first) and rebuild the cell indexes
+
+        Food or special food left under the new body is removed.
+        """
+        area = self.grid_width * self.grid_height
+        # Ring buffer of flat cell indices (y * grid_width + x). The head moves
+        # forward through the buffer and the tail follows it, so a move writes
+        # one slot and bumps two pointers.
+        self._body = array('I', bytes(4 * area))
+        # One byte per cell, non-zero where the snake is
+        self._occupied = bytearray(area)
+        self._length = len(segments)
+        for i, (x, y) in enumerate(reversed(segments)):
+            cell = y * self.grid_width + x
+            self._body[i] = cell
+            self._occupied[cell] = 1
+        self._tail = 0
+        self._head = self._length - 1
+        self._view = SnakeBody(self)
+
+        # Free-cell index: the first _free_count entries of _free are the cells
+        # holding neither snake nor food, and _free_pos maps a cell to its slot
+        # so it can be swap-removed in constant time.
+        self._free = array('I', range(area))
+        self._free_pos = array('I', range(area))
+        self._free_count = area
+        for cell in range(area):
+            if self._occupied[cell]:
+                self._take_cell(cell)
+        if self._food != NO_CELL:
+            if self._occupied[self._food]:
+                self._food = NO_CELL
+            else:
+                self._take_cell(self._food)
+        if self._special != NO_CELL:
+            if self._occupied[self._special]:
+                self._special = NO_CELL
+            else:
+                self._take_cell(self._special)
+
+    def is_free(self, cell: Tuple[int, int]) -> bool:
+        """Return True if no snake segment occupies cell"""
+        return not self._occupied[cell[1] * self.grid_width + cell[0]]
+
+    def _take_cell(self, cell: int):
+        """Remove a flat cell index from the free-cell index if it is there"""
+        position = self._free_pos[cell]
+        count = self._free_count
+        if position < count and self._free[position] == cell:
+            last = self._free[count - 1]
+            self._free[position] = last
+            self._free_pos[last] = position
+            self._free[count - 1] = cell
+            self._free_pos[cell] = count - 1
+            self._free_count = count - 1
+            if self._log is not None:
+                self._log.append((_UNDO_TAKE, cell, position))
+
+    def _release_cell(self, cell: int):
+        """Return a flat cell index to the free-cell index"""
+        count = self._free_count
+        if self._log is not None:
+            self._log.append((_UNDO_RELEASE, self._free[count], self._free_pos[cell]))
+        self._free[count] = cell
+        self._free_pos[cell] = count
+        self._free_count = count + 1
+
+    def _random(self) -> random.Random:
+        """The game's random stream, made ready to be drawn from
+
+        A stream still shared with a clone is copied first, and its state is
+        saved for undo frames that have not seen it used yet.
+        """
+        if self._rng_shared:
+            rng = random.Random()
+            rng.setstate(self.rng.getstate())
+            self.rng = rng
+            self._rng_shared = False
+        if self._rng_unsaved:
+            state = self.rng.getstate()
+            for frame in self._rng_unsaved:
+                frame[2] = state
+            self._rng_unsaved.clear()
+        return self.rng
+
+    def clone(self) -> 'SnakeEngine':
+        """Return an independent copy of the game; open undo frames are not copied
+
+        The random stream is shared until either game next draws from it.
+        """
+        other = SnakeEngine.__new__(SnakeEngine)
+        other.grid_width = self.grid_width
+        other.grid_height = self.grid_height
+        other.score_multiplier = self.score_multiplier
+        other.rules = self.rules
+        other.speed = self.speed
+        other.special_food_lifetime = self.special_food_lifetime
+        other._neighbours = self._neighbours
+        other.rng = self.rng
+        self._rng_shared = other._rng_shared = True
+        (other.score, other.game_over, other.won, other.food_timer, other.ticks,
+         other._direction, other._opposite, other._step_table,
+         other._food, other._special, other._special_spawn, other._special_points,
+         other._length, other._tail, other._head, other._free_count) = self._scalars()
+        other._body = self._body[:]
+        other._occupied = self._occupied[:]
+        other._free = self._free[:]
+        other._free_pos = self._free_pos[:]
+        other._view = SnakeBody(other)
+        other._frames = []
+        other._log = None
+        other._rng_unsaved = []
+        return other
+
+    def _scalars(self) -> tuple:
+        """Every scalar that step() may change, in the order pop() restores them"""
+        return (self.score, self.game_over, self.won, self.food_timer, self.ticks,
+                self._direction, self._opposite, self._step_table,
+                self._food, self._special, self._special_spawn, self._special_points,
+                self._length, self._tail, self._head, self._free_count)
+
+    def push(self):
+        """Open an undo frame; the matching pop() rewinds every step() taken since
+
+        Frames nest. Only step() is recorded, so do not call reset(),
+        set_snake() or place_food() while a frame is open.
+        """
+        if self._log is None:
+            self._log = []
+        # [log position, scalars, random state once the stream gets used]
+        frame = [len(self._log), self._scalars(), None]
+        self._frames.append(frame)
+        self._rng_unsaved.append(frame)
+
+    def pop(self):
+        """Rewind the game to the state it had at the matching push()"""
+        log_start, scalars, rng_state = self._frames.pop()
+        log = self._log
+        if len(log) > log_start:
+            free = self._free
+            free_pos = self._free_pos
+            occupied = self._occupied
+            body = self._body
+            count = self._free_count
+            # Undo newest first, so each entry sees the state it was written in
+            for i in range(len(log) - 1, log_start - 1, -1):
+                kind, a, b = log[i]
+                if kind == _UNDO_OCCUPIED:
+                    occupied[a] = b
+                elif kind == _UNDO_BODY:
+                    body[a] = b
+                elif kind == _UNDO_TAKE:
+                    # Cell a was swapped from slot b to the end of the free cells
+                    last = free[b]
+                    free[b] = a
+                    free_pos[a] = b
+                    free[count] = last
+                    free_pos[last] = count
+                    count += 1
+                else:
+                    # A cell was appended at the end; a and b are the values it overwrote
+                    count -= 1
+                    cell = free[count]
+                    free[count] = a
+                    free_pos[cell] = b
+            del log[log_start:]
+
+        (self.score, self.game_over, self.won, self.food_timer, self.ticks,
+         self._direction, self._opposite, self._step_table,
+         self._food, self._special, self._special_spawn, self._special_points,
+         self._length, self._tail, self._head, self._free_count) = scalars
+        if rng_state is not None:
+            self._random().setstate(rng_state)
+        elif self._rng_unsaved:
+            self._rng_unsaved.pop()  # This frame never saw the stream used
+        if not self._frames:
+            self._log = None
+
+    def place_food(self, cell: Tuple[int, int]):
+        """Move the regular food to a free cell, e.g. to set up a board"""
+        flat = cell[1] * self.grid_width + cell[0]
+        if self._occupied[flat] or flat == self._special:
+            raise ValueError(f'cell {cell} is not free')
+        if self._food != NO_CELL:
+            self._release_cell(self._food)
+        self._take_cell(flat)
+        self._food = flat
+
+    def _generate_cell(self) -> int:
+        """Reserve a random cell holding neither snake nor food, or return NO_CELL if there is none"""
+        if not self._free_count:
+            return NO_CELL
+        cell = self._free[self._random().randrange(self._free_count)]
+        self._take_cell(cell)
+        return cell
+
+    def generate_food(self) -> Optional[Tuple[int, int]]:
+        """Reserve a random cell holding neither snake nor food, or None if there is none"""
+        cell = self._generate_cell()
+        if cell == NO_CELL:
+            return None
+        return (cell % self.grid_width, cell // self.grid_width)
+
+    def generate_special_food(self) -> bool:
+        """Generate special food that gives bonus points"""
+        if self._special == NO_CELL and self._random().random() < SPECIAL_FOOD_CHANCE:
+            cell = self._generate_cell()
+            if cell == NO_CELL:
+                return False
+            self._special = cell
+            self._special_spawn = self.ticks
+            self._special_points = SPECIAL_FOOD_POINTS
+            return True
+        return False
+
+    def step(self, action: Optional[Direction] = None) -> StepResult:
+        """Advance the game by one move, turning to action first if it is legal"""
+        if self.game_over:
+            return StepResult(False, False, not self.won, self.won)
+
+        # Ignore turns that would reverse the snake into itself
+        if action is not None and action is not Direction.NONE and action is not self._opposite:
+            self.direction = action
+        self.ticks += 1
+
+        body = self._body
+
+        # Move snake: one table lookup gives the next cell, or WALL
+        new_cell = self._step_table[body[self._head]]
+
+        # Check for collision with a wall or with self (the tail has not moved
+        # yet, so it counts)
+        if new_cell == WALL or self._occupied[new_cell]:
+            self.game_over = True
+            return StepResult(False, False, True)
+
+        self._head += 1
+        if self._head == len(body):
+            self._head = 0
+        log = self._log
+        if log is not None:
+            # The slot may still hold a segment of the body at an open push()
+            log.append((_UNDO_BODY, self._head, body[self._head]))
+            log.append((_UNDO_OCCUPIED, new_cell, 0))
+        body[self._head] = new_cell
+        self._length += 1
+        self._occupied[new_cell] = 1
+        self._take_cell(new_cell)
+
+        # Check if food is eaten
+        ate_food = False
+        if new_cell == self._food:
+            self.score += 1 * self.score_multiplier
+            self._food = self._generate_cell()
+            ate_food = True
+
+            # Chance to spawn special food
+            if self._random().random() < SPECIAL_FOOD_CHANCE:
+                self.generate_special_food()
+
+        # Check if special food is eaten
+        ate_special = False
+        if new_cell == self._special:
+            self.score += self._special_points * self.score_multiplier  # Bonus points
+            self._special = NO_CELL
+            ate_special = True
+
+        # Remove tail only if no food was eaten
+        if not (ate_food or ate_special):
+            tail_cell = body[self._tail]
+            if log is not None:
+                log.append((_UNDO_OCCUPIED, tail_cell, 1))
+            self._occupied[tail_cell] = 0
+            self._release_cell(tail_cell)
+            self._tail += 1
+            if self._tail == len(body):
+                self._tail = 0
+            self._length -= 1
+
+        # A snake covering the whole board has won
+        if self._length == len(body):
+            self.game_over = True
+            self.won = True
+            return StepResult(ate_food, ate_special, False, True)
+
+        # Special food disappears after its lifetime
+        if self._special != NO_CELL and self.ticks - self._special_spawn > self.special_food_lifetime:
+            self._release_cell(self._special)
+            self._special = NO_CELL
+
+        # Update food timer
+        self.food_timer += 1
+        if self.food_timer > FOOD_RELOCATE_MOVES:  # Move food if not eaten
+            if self._food != NO_CELL:
+                self._release_cell(self._food)
+            self._food = self._generate_cell()
+            self.food_timer = 0
+        elif self._food == NO_CELL:
+            # The board was too full to place food when it was last eaten
+            self._food = self._generate_cell()
+
+        return StepResult(ate_food, ate_special, False)
+
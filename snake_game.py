@@ -1,13 +1,21 @@
 import pygame
 import pygame_gui
-import random
 import time
 import sys
-import json
+import math
 import os
+import random
 from enum import Enum, auto
+from itertools import chain, repeat
 from typing import List, Tuple, Optional, Dict, Any
 
+from leaderboard import Leaderboard
+from render_cache import FontRegistry, LayoutCache, SpriteAtlas, TextCache
+from replay import GAME_RULES, ReplayRecorder, replay_file_name
+from score_store import JournalStore, ScoreWriter, SqliteStore
+from verify_service import encode_submission, submission_path
+from snake_engine import Difficulty, Direction, SnakeBody, SnakeEngine, grid_dimensions
+
 # Initialize pygame and mixer
 pygame.init()
 pygame.mixer.init()
@@ -18,7 +26,15 @@ WINDOW_HEIGHT = 768
 GRID_SIZE = 24
 GRID_WIDTH = 30  # Will be adjusted based on window size
 GRID_HEIGHT = 20  # Will be adjusted based on window size
-FPS = 60
+FPS = 60  # Render rate cap; game logic ticks at the difficulty's speed
+MAX_TICKS_PER_FRAME = 5  # Drop logic ticks after a long stall instead of spiralling
+TURBO_FACTOR = 8  # Game speed multiplier while turbo mode (T key) is on
+IDLE_TIMEOUT_MS = 500  # Longest sleep on screens that only change on input
+CURSOR_BLINK_MS = 500  # Name entry cursor toggles this often
+GRADIENT_SEGMENTS = 26  # Body segments from this index on share the darkest shade
+HIGH_SCORE_ROWS = 10  # Rows visible at once in the high score table
+HIGH_SCORE_WHEEL_ROWS = 3  # Rows scrolled per mouse wheel notch
+HIGH_SCORE_PROMPT_RANK = 10  # Scores in this top N get the name prompt and banner
 
 # Colors
 BLACK = (0, 0, 0)
@@ -43,22 +59,37 @@ class GameState(Enum):
     HIGH_SCORES = auto()
     DIFFICULTY_SELECT = auto()
 
-# Difficulty levels
-class Difficulty(Enum):
-    EASY = {"name": "Easy", "speed": 8, "grid_size": 24, "score_multiplier": 1}
-    MEDIUM = {"name": "Medium", "speed": 12, "grid_size": 20, "score_multiplier": 2}
-    HARD = {"name": "Hard", "speed": 18, "grid_size": 16, "score_multiplier": 3}
+# Screens that stay still until the player does something
+IDLE_STATES = (
+    GameState.MAIN_MENU,
+    GameState.DIFFICULTY_SELECT,
+    GameState.HIGH_SCORES,
+    GameState.PAUSED,
+    GameState.GAME_OVER,
+)
 
-# High score file
+# High score snapshot and the journal of scores added since it was written
 HIGH_SCORE_FILE = "high_scores.json"
+HIGH_SCORE_JOURNAL = "high_scores.journal"
+HIGH_SCORE_CAPACITY = 10000  # Scores kept per difficulty
 
-# Directions
-class Direction(Enum):
-    UP = (0, -1)
-    DOWN = (0, 1)
-    LEFT = (-1, 0)
-    RIGHT = (1, 0)
-    NONE = (0, 0)  # For when the game is not moving
+# 'json' keeps the snapshot and journal above; 'sqlite' keeps every score in
+# HIGH_SCORE_DB, importing the JSON files the first time it runs
+HIGH_SCORE_BACKEND = os.environ.get('SNAKE_HIGH_SCORE_BACKEND', 'json')
+HIGH_SCORE_DB = "high_scores.db"
+# When set, new high scores are handed to verify_service.py in this
+# directory, backed by the game's replay, instead of being saved here
+SCORE_SUBMISSION_DIR = os.environ.get('SNAKE_SCORE_SUBMISSIONS')
+DEFAULT_HIGH_SCORES = {
+    'Easy': [{"name": "Player", "score": 100, "date": "2023-01-01"}],
+    'Medium': [{"name": "Player", "score": 200, "date": "2023-01-01"}],
+    'Hard': [{"name": "Player", "score": 300, "date": "2023-01-01"}]
+}
+
+# Resolved system font paths, so later startups skip the font scan
+FONT_CACHE_FILE = "font_cache.json"
+REPLAY_DIR = "replays"  # Every finished game is saved here; verify with replay.py
+fonts = FontRegistry(FONT_CACHE_FILE)
 
 class SnakeGame:
     def __init__(self):
@@ -72,17 +103,37 @@ class SnakeGame:
         # Game state
         self.state = GameState.MAIN_MENU
         self.difficulty = Difficulty.MEDIUM
+        self.score_store = self.create_score_store()
+        # Saves run on this thread so the game never waits on the disk
+        self.score_writer = ScoreWriter(self.score_store)
         self.high_scores = self.load_high_scores()
+        self.high_score_scroll = 0  # Index of the first visible row in the table
         
         # UI elements
         self.buttons = {}
         self.create_ui_elements()
         
         # Game variables (will be initialized in reset_game)
+        # The one clock that paces the main loop; it sleeps between frames
         self.clock = pygame.time.Clock()
-        self.font_large = pygame.font.SysFont('Arial', 64, bold=True)
-        self.font_medium = pygame.font.SysFont('Arial', 36, bold=True)
-        self.font_small = pygame.font.SysFont('Arial', 24)
+        self.tick_accumulator = 0.0
+        self.needs_redraw = True
+        self.font_large = fonts.get('Arial', 64, bold=True)
+        self.font_medium = fonts.get('Arial', 36, bold=True)
+        self.font_small = fonts.get('Arial', 24)
+        fonts.save()
+        self.text_cache = TextCache()
+        
+        # High score screen, rendered only when its scores, tab or scroll change
+        self.high_score_table = LayoutCache(self.render_high_score_table)
+        
+        # Translucent pause and game over overlays, built once per window size
+        self.pause_overlay = LayoutCache(self.render_overlay)
+        self.game_over_overlay = LayoutCache(self.render_overlay)
+        
+        # Snake, food and special food sprites, rendered once per grid size
+        # and kept across games
+        self.sprite_atlases: Dict[int, SpriteAtlas] = {}
         
         # Sound effects
         self.sounds = {
@@ -222,49 +273,66 @@ class SnakeGame:
             visible=False
         )
 
-    def load_high_scores(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Load high scores from file or return default if not found"""
+    def create_score_store(self):
+        """Storage backend for high scores, chosen by HIGH_SCORE_BACKEND"""
+        if HIGH_SCORE_BACKEND == 'sqlite':
+            return SqliteStore(HIGH_SCORE_DB, HIGH_SCORE_FILE, HIGH_SCORE_JOURNAL, HIGH_SCORE_CAPACITY)
+        return JournalStore(HIGH_SCORE_FILE, HIGH_SCORE_JOURNAL)
+    
+    def load_high_scores(self) -> Dict[str, Leaderboard]:
+        """Load the high score snapshot and replay the journal, or return defaults"""
+        scores = DEFAULT_HIGH_SCORES
         try:
-            if os.path.exists(HIGH_SCORE_FILE):
-                with open(HIGH_SCORE_FILE, 'r') as f:
-                    return json.load(f)
+            scores = self.score_store.load(DEFAULT_HIGH_SCORES)
         except Exception as e:
             print(f"Error loading high scores: {e}")
         
-        # Return default high scores if file doesn't exist or there's an error
-        return {
-            'Easy': [{"name": "Player", "score": 100, "date": "2023-01-01"}],
-            'Medium': [{"name": "Player", "score": 200, "date": "2023-01-01"}],
-            'Hard': [{"name": "Player", "score": 300, "date": "2023-01-01"}]
-        }
+        high_scores = {name: Leaderboard(HIGH_SCORE_CAPACITY, entries) for name, entries in scores.items()}
+        if self.score_writer.should_compact:
+            self.save_high_scores(high_scores)
+        return high_scores
     
-    def save_high_scores(self):
-        """Save high scores to file"""
-        try:
-            with open(HIGH_SCORE_FILE, 'w') as f:
-                json.dump(self.high_scores, f, indent=2)
-        except Exception as e:
-            print(f"Error saving high scores: {e}")
+    def save_high_scores(self, high_scores: Optional[Dict[str, Leaderboard]] = None):
+        """Queue writing all high scores to a new snapshot and emptying the journal"""
+        high_scores = self.high_scores if high_scores is None else high_scores
+        # entries() lists are replaced, never changed, when a board changes,
+        # so the writer thread can read them safely
+        self.score_writer.compact({name: board.entries() for name, board in high_scores.items()})
     
     def add_high_score(self, name: str, score: int):
         """Add a new high score"""
         difficulty = self.difficulty.value['name']
-        if difficulty not in self.high_scores:
-            self.high_scores[difficulty] = []
+        if SCORE_SUBMISSION_DIR:
+            # The verification service re-simulates the replay and stores
+            # the score only if it holds up, so it is not shown here until
+            # a later session loads it
+            if self.leaderboard(difficulty).qualifies(score):
+                replay_data = self.recorder.finish(self.engine.ticks, score)
+                self.score_writer.write_file(submission_path(SCORE_SUBMISSION_DIR, replay_data),
+                                             encode_submission(name, replay_data))
+            return
         
-        # Add new score
-        self.high_scores[difficulty].append({
+        # Add new score, dropping the lowest once the board is full
+        entry = {
             "name": name,
             "score": score,
             "date": time.strftime("%Y-%m-%d")
-        })
-        
-        # Sort by score (descending) and keep top 10
-        self.high_scores[difficulty].sort(key=lambda x: x['score'], reverse=True)
-        self.high_scores[difficulty] = self.high_scores[difficulty][:10]
+        }
+        if not self.leaderboard(difficulty).add(entry):
+            return
         
-        # Save to file
-        self.save_high_scores()
+        # Append to the journal in the background, folding it into a new
+        # snapshot now and then
+        self.score_writer.append(difficulty, entry)
+        if self.score_writer.should_compact:
+            self.save_high_scores()
+    
+    def leaderboard(self, difficulty_name: Optional[str] = None) -> Leaderboard:
+        """High score board for a difficulty (the current one by default)"""
+        difficulty_name = difficulty_name or self.difficulty.value['name']
+        if difficulty_name not in self.high_scores:
+            self.high_scores[difficulty_name] = Leaderboard(HIGH_SCORE_CAPACITY)
+        return self.high_scores[difficulty_name]
     
     def reset_game(self):
         """Reset the game state"""
@@ -274,55 +342,87 @@ class SnakeGame:
         
         # Calculate grid dimensions based on window size and difficulty
         self.grid_size = self.difficulty.value['grid_size']
-        self.grid_width = (WINDOW_WIDTH - 400) // self.grid_size  # Leave space for UI
-        self.grid_height = (WINDOW_HEIGHT - 100) // self.grid_size
-        
-        # Game state
-        self.direction = Direction.RIGHT
+        self.grid_width, self.grid_height = grid_dimensions(self.difficulty, (WINDOW_WIDTH, WINDOW_HEIGHT))
+        
+        # Game rules and state live in the headless engine. Each game gets
+        # its own seed, so its replay only needs the seed and the turns
+        self.seed = random.getrandbits(64)
+        self.engine = SnakeEngine(self.grid_width, self.grid_height, self.score_multiplier,
+                                  self.seed, GAME_RULES, self.speed)
+        self.recorder = ReplayRecorder(self.seed, self.difficulty, GAME_RULES, self.grid_width, self.grid_height)
+        self.replay_path: Optional[str] = None  # Where this game's replay was saved
         self.next_direction = Direction.RIGHT
-        self.snake = [(self.grid_width // 2, self.grid_height // 2)]
-        self.snake.append((self.snake[0][0] - 1, self.snake[0][1]))  # Add initial body segment
-        
-        # Initialize special food first to avoid reference before assignment
-        self.special_food = None
-        self.special_food_timer = 0
-        
-        # Now generate food
-        self.food = self.generate_food()
-        self.score = 0
         self.game_over = False
         self.paused = False
+        self.turbo = False
+        self.new_high_score = False  # Decided once, when the game ends
         self.last_score = 0
-        self.food_timer = 0
+        self.tick_accumulator = 0.0
+        self.needs_redraw = True
+
+        # Dirty-rectangle rendering: what the play field looked like when last drawn
+        self.full_redraw = True
+        self.drawn_field = None
+        
+        # The paused or game over screen, composed once and reused until the
+        # state or window changes
+        self.frozen_frame: Optional[pygame.Surface] = None
+        
+        # Game area and grid, rendered once per layout
+        self.game_background = LayoutCache(self.render_game_background)
+        
+        # Screen position of every cell, indexed by flat cell index
+        self.cell_positions = LayoutCache(self.compute_cell_positions)
         
         # Calculate game area position (centered)
         self.game_area_x = (WINDOW_WIDTH - (self.grid_width * self.grid_size)) // 2
         self.game_area_y = 80  # Leave space for score and UI
 
-    def generate_food(self) -> Tuple[int, int]:
-        """Generate food at a random position not occupied by the snake"""
-        while True:
-            food = (random.randint(0, self.grid_width - 1), random.randint(0, self.grid_height - 1))
-            if food not in self.snake and (not self.special_food or food != self.special_food[0]):
-                return food
-    
-    def generate_special_food(self):
-        """Generate special food that gives bonus points"""
-        if not self.special_food and random.random() < 0.2:  # 20% chance to spawn special food
-            food_pos = self.generate_food()
-            self.special_food = (food_pos, time.time(), 10)  # (position, spawn_time, points)
-            self.special_food_timer = time.time()
-            return True
-        return False
+    @property
+    def snake(self) -> SnakeBody:
+        return self.engine.snake
+
+    @property
+    def food(self) -> Optional[Tuple[int, int]]:
+        return self.engine.food
+
+    @property
+    def special_food(self):
+        return self.engine.special_food
+
+    @property
+    def score(self) -> int:
+        return self.engine.score
+
+    @property
+    def direction(self) -> Direction:
+        return self.engine.direction
 
-    def handle_events(self):
-        time_delta = self.clock.tick(FPS) / 1000.0
+    def wait_for_events(self, timeout_ms: int) -> List[pygame.event.Event]:
+        """Sleep until input arrives or timeout_ms passes, then return pending events"""
+        events = pygame.event.get()
+        if not events:
+            event = pygame.event.wait(timeout_ms)
+            if event.type != pygame.NOEVENT:
+                events = [event] + pygame.event.get()
+        return events
+    
+    def handle_events(self, time_delta: float, events: Optional[List[pygame.event.Event]] = None):
+        if events is None:
+            events = pygame.event.get()
         
-        for event in pygame.event.get():
+        for event in events:
+            # Any input may change what is on screen
+            self.needs_redraw = True
+            
             # Handle UI events
             self.ui_manager.process_events(event)
             
             if event.type == pygame.QUIT:
+                # Keep the replay of a game left unfinished
+                if self.state in (GameState.PLAYING, GameState.PAUSED) and self.engine.ticks:
+                    self.save_replay()
+                self.score_writer.flush()
                 return False
             
             if event.type == pygame.VIDEORESIZE:
@@ -330,11 +430,15 @@ class SnakeGame:
                 self.screen = pygame.display.set_mode((event.w, event.h), pygame.RESIZABLE)
                 self.ui_manager.set_window_resolution((event.w, event.h))
                 self.update_ui_positions()
+                self.full_redraw = True
             
             if event.type == pygame.USEREVENT:
                 if event.user_type == pygame_gui.UI_BUTTON_PRESSED:
                     self.handle_button_click(event.ui_element)
             
+            if self.state == GameState.HIGH_SCORES:
+                self.handle_high_scores_event(event)
+            
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     if self.state == GameState.PLAYING:
@@ -357,11 +461,43 @@ class SnakeGame:
                     elif event.key == pygame.K_p:
                         self.state = GameState.PAUSED
                         self.update_ui_visibility()
+                    elif event.key == pygame.K_t:
+                        self.turbo = not self.turbo
         
         # Update UI
         self.ui_manager.update(time_delta)
         return True
     
+    def handle_high_scores_event(self, event: pygame.event.Event):
+        """Switch difficulty tabs on click and scroll the table with the wheel or keys"""
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            for difficulty, tab_rect in self.high_score_tab_rects():
+                if tab_rect.collidepoint(event.pos):
+                    self.difficulty = difficulty
+                    self.high_score_scroll = 0
+        elif event.type == pygame.MOUSEWHEEL:
+            self.scroll_high_scores(-event.y * HIGH_SCORE_WHEEL_ROWS)
+        elif event.type == pygame.KEYDOWN:
+            rows = {
+                pygame.K_UP: -1,
+                pygame.K_DOWN: 1,
+                pygame.K_PAGEUP: -HIGH_SCORE_ROWS,
+                pygame.K_PAGEDOWN: HIGH_SCORE_ROWS,
+                pygame.K_HOME: -len(self.current_high_scores()),
+                pygame.K_END: len(self.current_high_scores()),
+            }.get(event.key)
+            if rows:
+                self.scroll_high_scores(rows)
+    
+    def scroll_high_scores(self, rows: int):
+        """Move the high score table by rows, keeping a full page in view"""
+        last_page = max(0, len(self.current_high_scores()) - HIGH_SCORE_ROWS)
+        self.high_score_scroll = min(max(self.high_score_scroll + rows, 0), last_page)
+    
+    def current_high_scores(self) -> List[Dict[str, Any]]:
+        """High score entries for the current difficulty, best first"""
+        return self.leaderboard().entries()
+    
     def handle_button_click(self, button):
         """Handle button clicks from the UI"""
         if button == self.buttons['new_game']:
@@ -375,6 +511,7 @@ class SnakeGame:
             
         elif button == self.buttons['high_scores']:
             self.state = GameState.HIGH_SCORES
+            self.high_score_scroll = 0
             self.update_ui_visibility()
             
         elif button == self.buttons['quit']:
@@ -419,90 +556,51 @@ class SnakeGame:
         return True
 
     def update(self):
+        """Run one logic tick; run() calls this self.speed times per second"""
         if self.state != GameState.PLAYING or self.game_over:
             return
-            
-        # Update direction
-        self.direction = self.next_direction
-        
-        # Only move the snake at the appropriate speed
-        current_time = time.time()
-        if current_time - self.last_update_time < 1.0 / self.speed:
-            return
-            
-        self.last_update_time = current_time
-        
-        dx, dy = self.direction.value
         
-        # Move snake
-        head_x, head_y = self.snake[0]
-        new_head = ((head_x + dx) % self.grid_width, (head_y + dy) % self.grid_height)
+        self.recorder.record(self.engine.ticks, self.next_direction)
+        result = self.engine.step(self.next_direction)
+        self.needs_redraw = True
         
-        # Check for collision with self
-        if new_head in self.snake[1:]:
+        if result.died or result.won:
             self.game_over = True
+            # The board keeps far more scores than it shows; only a place
+            # in the visible top earns the prompt
+            self.new_high_score = self.score > 0 and self.leaderboard().in_top(self.score, HIGH_SCORE_PROMPT_RANK)
             self.state = GameState.GAME_OVER
             self.update_ui_visibility()
+            self.save_replay()
             
             # Add to high scores if score is high enough
-            if self.score > 0:
-                difficulty_name = self.difficulty.value['name']
-                if (difficulty_name in self.high_scores and 
-                    (len(self.high_scores[difficulty_name]) < 10 or 
-                     self.score > self.high_scores[difficulty_name][-1]['score'])):
-                    # Show high score input dialog
-                    self.show_high_score_input()
+            if self.new_high_score:
+                # Show high score input dialog
+                self.show_high_score_input()
             
             if hasattr(self, 'sounds') and 'game_over' in self.sounds:
                 self.sounds['game_over'].play()
                 
             return
         
-        self.snake.insert(0, new_head)
-        
-        # Check if food is eaten
-        food_eaten = False
-        if new_head == self.food:
-            self.score += 1 * self.score_multiplier
-            self.food = self.generate_food()
-            food_eaten = True
-            
-            # Play sound effect
-            if hasattr(self, 'sounds') and 'eat' in self.sounds:
-                self.sounds['eat'].play()
-                
-            # Chance to spawn special food
-            if random.random() < 0.2:  # 20% chance
-                self.generate_special_food()
-        
-        # Check if special food is eaten
-        if (self.special_food and 
-            new_head[0] == self.special_food[0][0] and 
-            new_head[1] == self.special_food[0][1]):
-            self.score += self.special_food[2] * self.score_multiplier  # Bonus points
-            self.special_food = None
-            food_eaten = True
-            
-            # Play sound effect
-            if hasattr(self, 'sounds') and 'eat' in self.sounds:
+        # Play sound effect for each food eaten
+        for eaten in (result.ate_food, result.ate_special):
+            if eaten and hasattr(self, 'sounds') and 'eat' in self.sounds:
                 self.sounds['eat'].play()
-        
-        # Remove tail only if no food was eaten
-        if not food_eaten:
-            self.snake.pop()
-        
-        # Update special food timer
-        if self.special_food:
-            if current_time - self.special_food[1] > 10:  # Special food disappears after 10 seconds
-                self.special_food = None
-        
-        # Update food timer
-        self.food_timer += 1
-        if self.food_timer > 100:  # Move food every 100 frames if not eaten
-            self.food = self.generate_food()
-            self.food_timer = 0
+
+    def save_replay(self):
+        """Queue the current game's replay to be written to REPLAY_DIR"""
+        path = os.path.join(REPLAY_DIR, replay_file_name(self.seed, self.difficulty))
+        # On the writer thread, like the high scores, so game over never waits on the disk
+        self.score_writer.write_file(path, self.recorder.finish(self.engine.ticks, self.score))
+        self.replay_path = path
 
     def draw(self):
+        # While playing, only repaint what changed since the last frame
+        if self.state == GameState.PLAYING and not self.full_redraw and self.drawn_field:
+            self.draw_game_dirty()
+            return
+        
         # Clear screen
         self.screen.fill(BLACK)
         
@@ -513,30 +611,116 @@ class SnakeGame:
             self.draw_difficulty_select()
         elif self.state == GameState.HIGH_SCORES:
             self.draw_high_scores()
-        elif self.state in [GameState.PLAYING, GameState.PAUSED, GameState.GAME_OVER]:
+        elif self.state == GameState.PLAYING:
             self.draw_game()
+        elif self.state in [GameState.PAUSED, GameState.GAME_OVER]:
+            self.draw_frozen_game()
         
         # Draw UI elements
         self.ui_manager.draw_ui(self.screen)
         
         # Update display
         pygame.display.flip()
+        self.full_redraw = False
+        self.drawn_field = self.play_field_snapshot() if self.state == GameState.PLAYING else None
+    
+    def draw_frozen_game(self):
+        """Draw the paused or game over screen, composing it only when it changed
+        
+        Nothing under the overlay moves while paused or after the game ends,
+        so later frames only blit the stored frame and redraw the UI on top.
+        """
+        if self.full_redraw or self.frozen_frame is None or self.frozen_frame.get_size() != self.screen.get_size():
+            self.draw_game()
+            self.frozen_frame = self.screen.copy()
+        else:
+            self.screen.blit(self.frozen_frame, (0, 0))
+    
+    def play_field_snapshot(self) -> Dict[str, Any]:
+        """Record what is on the play field so the next frame can redraw only changes"""
+        return {
+            'ticks': self.engine.ticks,
+            'head': self.snake[:GRADIENT_SEGMENTS],
+            'tail': self.snake[-MAX_TICKS_PER_FRAME:],
+            'food': self.food,
+            'special_food': self.special_food[0] if self.special_food else None,
+            'hud': (self.score, self.current_high_score(), self.turbo),
+        }
+    
+    def hud_regions(self) -> List[pygame.Rect]:
+        """Screen areas above and left of the play field, where the HUD is drawn"""
+        top = self.game_area_y - 10
+        left = self.game_area_x - 10
+        return [
+            pygame.Rect(0, 0, self.screen.get_width(), top),
+            pygame.Rect(0, top, left, self.screen.get_height() - top)
+        ]
+    
+    def draw_game_dirty(self):
+        """Redraw only the cells, HUD and buttons that changed since the last frame
+        
+        A move changes the new head, the old tail and the food, plus the
+        first GRADIENT_SEGMENTS segments whose shade depends on their index,
+        so the work per frame does not grow with the snake or the board.
+        """
+        previous = self.drawn_field
+        current = self.play_field_snapshot()
+        if current['ticks'] - previous['ticks'] > MAX_TICKS_PER_FRAME:
+            # Too many moves to know which tail cells were vacated
+            self.full_redraw = True
+            self.draw()
+            return
+        
+        head = current['head']
+        dirty = set(previous['head']) | set(head) | set(previous['tail'])
+        for item in (previous['food'], previous['special_food'], current['food'], current['special_food']):
+            if item:
+                dirty.add(item)
+        
+        # Clear every dirty cell, then repaint whatever is in it now
+        for x, y in dirty:
+            self.draw_cell_background(x, y)
+        head_cells = set(head)
+        for cell in dirty:
+            if cell not in head_cells and cell in self.snake:
+                self.draw_snake_segment(GRADIENT_SEGMENTS, *cell)
+        for i, (x, y) in enumerate(head):
+            self.draw_snake_segment(i, x, y)
+        self.draw_food()
+        self.draw_special_food()
+        rects = [self.cell_rect(x, y) for x, y in dirty]
+        
+        if current['hud'] != previous['hud']:
+            for region in self.hud_regions():
+                self.screen.set_clip(region)
+                self.screen.fill(BLACK)
+                self.draw_game_ui()
+                rects.append(region)
+            self.screen.set_clip(None)
+        
+        # Buttons are opaque, so they can be drawn straight over themselves
+        self.ui_manager.draw_ui(self.screen)
+        rects.extend(button.rect for button in self.buttons.values() if button.visible)
+        
+        pygame.display.update(rects)
+        self.drawn_field = current
     
     def draw_main_menu(self):
         """Draw the main menu screen"""
         # Draw title
-        title = self.font_large.render('SNAKE GAME', True, GREEN)
+        title = self.text_cache.render(self.font_large, 'SNAKE GAME', True, GREEN)
         title_rect = title.get_rect(center=(WINDOW_WIDTH // 2, 150))
         self.screen.blit(title, title_rect)
         
         # Draw version/subtitle
-        subtitle = self.font_small.render('Enhanced Edition', True, WHITE)
+        subtitle = self.text_cache.render(self.font_small, 'Enhanced Edition', True, WHITE)
         subtitle_rect = subtitle.get_rect(center=(WINDOW_WIDTH // 2, 220))
         self.screen.blit(subtitle, subtitle_rect)
         
         # Show last score if available
         if hasattr(self, 'last_score') and self.last_score > 0:
-            last_score_text = self.font_small.render(
+            last_score_text = self.text_cache.render(
+                self.font_small, 
                 f'Last Score: {self.last_score} ({self.difficulty.value["name"]})', 
                 True, 
                 WHITE
@@ -547,242 +731,275 @@ class SnakeGame:
     def draw_difficulty_select(self):
         """Draw the difficulty selection screen"""
         # Draw title
-        title = self.font_medium.render('Select Difficulty', True, WHITE)
+        title = self.text_cache.render(self.font_medium, 'Select Difficulty', True, WHITE)
         title_rect = title.get_rect(center=(WINDOW_WIDTH // 2, 200))
         self.screen.blit(title, title_rect)
     
     def draw_high_scores(self):
         """Draw the high scores screen"""
-        # Draw title
-        title = self.font_medium.render('HIGH SCORES', True, GOLD)
-        title_rect = title.get_rect(center=(WINDOW_WIDTH // 2, 100))
-        self.screen.blit(title, title_rect)
-        
-        # Draw difficulty tabs
-        difficulties = ['Easy', 'Medium', 'Hard']
+        # The difficulty may have changed since the table was scrolled
+        self.scroll_high_scores(0)
+        table = self.high_score_table.get(
+            self.difficulty.value['name'], self.leaderboard().version, self.high_score_scroll)
+        self.screen.blit(table, (0, 0))
+    
+    def high_score_tab_rects(self) -> List[Tuple[Difficulty, pygame.Rect]]:
+        """Screen area of each difficulty tab on the high scores screen"""
         tab_width = 200
         tab_height = 50
         tab_y = 160
+        tabs_x = (WINDOW_WIDTH - (len(Difficulty) * (tab_width + 10))) // 2
+        return [(difficulty, pygame.Rect(tabs_x + i * (tab_width + 10), tab_y, tab_width, tab_height))
+                for i, difficulty in enumerate(Difficulty)]
+    
+    def render_high_score_table(self, difficulty_name: str, version: int, scroll: int) -> pygame.Surface:
+        """Render the title, tabs and visible rows of the high scores screen
         
-        for i, diff in enumerate(difficulties):
-            tab_x = (WINDOW_WIDTH - (len(difficulties) * (tab_width + 10))) // 2 + i * (tab_width + 10)
-            
+        Only the HIGH_SCORE_ROWS rows starting at scroll are drawn, so the
+        cost does not depend on how many scores are stored.
+        """
+        table = pygame.Surface((WINDOW_WIDTH, 290 + HIGH_SCORE_ROWS * 45))
+        if pygame.display.get_surface() is not None:
+            table = table.convert()
+        table.fill(BLACK)
+        
+        # Draw title
+        title = self.text_cache.render(self.font_medium, 'HIGH SCORES', True, GOLD)
+        title_rect = title.get_rect(center=(WINDOW_WIDTH // 2, 100))
+        table.blit(title, title_rect)
+        
+        # Draw difficulty tabs
+        for difficulty, tab_rect in self.high_score_tab_rects():
             # Highlight current difficulty
-            color = BLUE if diff == self.difficulty.value['name'] else DARK_BLUE
-            pygame.draw.rect(self.screen, color, (tab_x, tab_y, tab_width, tab_height))
-            pygame.draw.rect(self.screen, WHITE, (tab_x, tab_y, tab_width, tab_height), 2)
+            diff = difficulty.value['name']
+            color = BLUE if diff == difficulty_name else DARK_BLUE
+            pygame.draw.rect(table, color, tab_rect)
+            pygame.draw.rect(table, WHITE, tab_rect, 2)
             
             # Draw difficulty name
-            diff_text = self.font_small.render(diff, True, WHITE)
-            diff_rect = diff_text.get_rect(center=(tab_x + tab_width // 2, tab_y + tab_height // 2))
-            self.screen.blit(diff_text, diff_rect)
-            
-            # Handle click on tab
-            mouse_pos = pygame.mouse.get_pos()
-            mouse_clicked = pygame.mouse.get_pressed()[0]
-            
-            if (tab_x <= mouse_pos[0] <= tab_x + tab_width and 
-                tab_y <= mouse_pos[1] <= tab_y + tab_height):
-                if mouse_clicked:
-                    self.difficulty = Difficulty[diff.upper()]
-                    # Small delay to prevent multiple clicks
-                    pygame.time.delay(200)
+            diff_text = self.text_cache.render(self.font_small, diff, True, WHITE)
+            diff_rect = diff_text.get_rect(center=tab_rect.center)
+            table.blit(diff_text, diff_rect)
         
         # Draw high scores for current difficulty
-        difficulty_name = self.difficulty.value['name']
         if difficulty_name in self.high_scores:
+            entries = self.high_scores[difficulty_name].entries()
             y_offset = 240
             
+            # Which rows are showing, when there are more than fit
+            if len(entries) > HIGH_SCORE_ROWS:
+                last_row = min(scroll + HIGH_SCORE_ROWS, len(entries))
+                range_text = self.text_cache.render(
+                    self.font_small, f'{scroll + 1}-{last_row} of {len(entries)}', True, LIGHT_GRAY)
+                table.blit(range_text, range_text.get_rect(midright=(WINDOW_WIDTH - 100, 100)))
+            
             # Column headers
-            header_bg = pygame.Surface((WINDOW_WIDTH - 200, 40))
-            header_bg.fill(DARK_BLUE)
-            self.screen.blit(header_bg, (100, y_offset - 5))
+            table.fill(DARK_BLUE, (100, y_offset - 5, WINDOW_WIDTH - 200, 40))
             
             headers = ['Rank', 'Name', 'Score', 'Date']
             col_widths = [100, 300, 200, 200]
             x_pos = 120
             
             for i, header in enumerate(headers):
-                header_text = self.font_small.render(header, True, WHITE)
-                self.screen.blit(header_text, (x_pos, y_offset))
+                header_text = self.text_cache.render(self.font_small, header, True, WHITE)
+                table.blit(header_text, (x_pos, y_offset))
                 x_pos += col_widths[i]
             
             y_offset += 50
             
             # High score entries
-            for i, entry in enumerate(self.high_scores[difficulty_name][:10]):
+            for i in range(scroll, min(scroll + HIGH_SCORE_ROWS, len(entries))):
+                entry = entries[i]
+                
                 # Alternate row colors
                 row_color = (40, 40, 40) if i % 2 == 0 else (30, 30, 30)
-                pygame.draw.rect(self.screen, row_color, (100, y_offset - 5, WINDOW_WIDTH - 200, 40))
+                pygame.draw.rect(table, row_color, (100, y_offset - 5, WINDOW_WIDTH - 200, 40))
                 
                 # Rank
                 rank = f'{i+1}.'
-                rank_text = self.font_small.render(rank, True, WHITE)
-                self.screen.blit(rank_text, (120, y_offset))
+                rank_text = self.text_cache.render(self.font_small, rank, True, WHITE)
+                table.blit(rank_text, (120, y_offset))
                 
                 # Name (truncate if too long)
                 name = entry['name'][:15] + '...' if len(entry['name']) > 15 else entry['name']
-                name_text = self.font_small.render(name, True, WHITE)
-                self.screen.blit(name_text, (220, y_offset))
+                name_text = self.text_cache.render(self.font_small, name, True, WHITE)
+                table.blit(name_text, (220, y_offset))
                 
                 # Score with color based on rank
                 score_color = GOLD if i == 0 else SILVER if i == 1 else BRONZE if i == 2 else WHITE
-                score_text = self.font_small.render(str(entry['score']), True, score_color)
-                self.screen.blit(score_text, (520, y_offset))
+                score_text = self.text_cache.render(self.font_small, str(entry['score']), True, score_color)
+                table.blit(score_text, (520, y_offset))
                 
                 # Date
-                date_text = self.font_small.render(entry['date'], True, WHITE)
-                self.screen.blit(date_text, (720, y_offset))
+                date_text = self.text_cache.render(self.font_small, entry['date'], True, WHITE)
+                table.blit(date_text, (720, y_offset))
                 
                 y_offset += 45
+        
+        return table
     
     def draw_game(self):
         """Draw the main game screen"""
-        # Draw game area background
-        game_area_rect = pygame.Rect(
-            self.game_area_x - 10, 
-            self.game_area_y - 10, 
-            self.grid_width * self.grid_size + 20, 
-            self.grid_height * self.grid_size + 20
-        )
-        pygame.draw.rect(self.screen, (30, 30, 30), game_area_rect)
-        pygame.draw.rect(self.screen, BLUE, game_area_rect, 2)
+        # Draw game area background and grid
+        self.screen.blit(self.get_game_background(), (self.game_area_x - 10, self.game_area_y - 10))
         
-        # Draw grid
-        for x in range(0, self.grid_width * self.grid_size, self.grid_size):
-            pygame.draw.line(
-                self.screen, 
-                (40, 40, 40), 
-                (self.game_area_x + x, self.game_area_y), 
-                (self.game_area_x + x, self.game_area_y + self.grid_height * self.grid_size)
-            )
-        for y in range(0, self.grid_height * self.grid_size, self.grid_size):
-            pygame.draw.line(
-                self.screen, 
-                (40, 40, 40), 
-                (self.game_area_x, self.game_area_y + y), 
-                (self.game_area_x + self.grid_width * self.grid_size, self.game_area_y + y)
-            )
+        # Draw snake in one batched blit: head, the gradient shades, then
+        # the darkest shade for the rest of the body
+        atlas = self.get_sprite_atlas()
+        positions = self.cell_positions.get(
+            self.grid_size, self.grid_width, self.grid_height, self.game_area_x, self.game_area_y)
+        shades = chain((atlas.heads[self.direction],), atlas.bodies[1:], repeat(atlas.bodies[-1]))
+        self.screen.blits(zip(shades, map(positions.__getitem__, self.snake.cells())), doreturn=False)
         
-        # Draw snake
-        for i, (x, y) in enumerate(self.snake):
-            # Head is a different color
-            if i == 0:
-                # Draw head with eyes
-                head_rect = pygame.Rect(
-                    self.game_area_x + x * self.grid_size + 2, 
-                    self.game_area_y + y * self.grid_size + 2, 
-                    self.grid_size - 4, 
-                    self.grid_size - 4
-                )
-                pygame.draw.rect(self.screen, DARK_GREEN, head_rect, border_radius=3)
-                
-                # Draw eyes
-                eye_size = max(2, self.grid_size // 6)
-                eye_offset = self.grid_size // 4
-                
-                # Left eye
-                if self.direction == Direction.RIGHT:
-                    eye1 = (x * self.grid_size + self.game_area_x + self.grid_size - eye_offset, 
-                           y * self.grid_size + self.game_area_y + eye_offset)
-                    eye2 = (x * self.grid_size + self.game_area_x + self.grid_size - eye_offset, 
-                           y * self.grid_size + self.game_area_y + self.grid_size - eye_offset * 2)
-                elif self.direction == Direction.LEFT:
-                    eye1 = (x * self.grid_size + self.game_area_x + eye_offset, 
-                           y * self.grid_size + self.game_area_y + eye_offset)
-                    eye2 = (x * self.grid_size + self.game_area_x + eye_offset, 
-                           y * self.grid_size + self.game_area_y + self.grid_size - eye_offset * 2)
-                elif self.direction == Direction.UP:
-                    eye1 = (x * self.grid_size + self.game_area_x + eye_offset, 
-                           y * self.grid_size + self.game_area_y + eye_offset)
-                    eye2 = (x * self.grid_size + self.game_area_x + self.grid_size - eye_offset * 2, 
-                           y * self.grid_size + self.game_area_y + eye_offset)
-                else:  # DOWN
-                    eye1 = (x * self.grid_size + self.game_area_x + eye_offset, 
-                           y * self.grid_size + self.game_area_y + self.grid_size - eye_offset)
-                    eye2 = (x * self.grid_size + self.game_area_x + self.grid_size - eye_offset * 2, 
-                           y * self.grid_size + self.game_area_y + self.grid_size - eye_offset)
-                
-                pygame.draw.circle(self.screen, WHITE, eye1, eye_size)
-                pygame.draw.circle(self.screen, WHITE, eye2, eye_size)
-                
-                # Pupils
-                pygame.draw.circle(self.screen, BLACK, eye1, eye_size // 2)
-                pygame.draw.circle(self.screen, BLACK, eye2, eye_size // 2)
-                
-            else:
-                # Body segment with gradient
-                segment_rect = pygame.Rect(
-                    self.game_area_x + x * self.grid_size + 1, 
-                    self.game_area_y + y * self.grid_size + 1, 
-                    self.grid_size - 2, 
-                    self.grid_size - 2
-                )
-                
-                # Create a gradient effect for the body
-                color_offset = min(50, i * 2)  # Darken based on position
-                body_color = (
-                    max(0, GREEN[0] - color_offset),
-                    max(0, GREEN[1] - color_offset),
-                    max(0, GREEN[2] - color_offset)
-                )
-                
-                pygame.draw.rect(self.screen, body_color, segment_rect, border_radius=2)
-                pygame.draw.rect(
-                    self.screen, 
-                    (0, 100, 0), 
-                    segment_rect, 
-                    width=1, 
-                    border_radius=2
-                )
+        # Draw food and special food
+        self.draw_food()
+        self.draw_special_food()
+        
+        # Draw score and game info
+        self.draw_game_ui()
         
-        # Draw food
-        food_rect = pygame.Rect(
-            self.game_area_x + self.food[0] * self.grid_size + 2, 
-            self.game_area_y + self.food[1] * self.grid_size + 2, 
-            self.grid_size - 4, 
-            self.grid_size - 4
+        # Draw game over or paused overlay
+        if self.state == GameState.GAME_OVER:
+            self.draw_game_over()
+        elif self.state == GameState.PAUSED:
+            self.draw_paused()
+    
+    def get_game_background(self) -> pygame.Surface:
+        """Game area and grid for the current layout, re-rendered only when it changes"""
+        return self.game_background.get(self.grid_size, self.grid_width, self.grid_height)
+    
+    def render_game_background(self, grid_size: int, grid_width: int, grid_height: int) -> pygame.Surface:
+        """Render the game area with its border and grid lines, including a 10px margin"""
+        surface = pygame.Surface((grid_width * grid_size + 20, grid_height * grid_size + 20))
+        surface.fill(BLACK)
+        game_area_rect = surface.get_rect()
+        pygame.draw.rect(surface, (30, 30, 30), game_area_rect)
+        pygame.draw.rect(surface, BLUE, game_area_rect, 2)
+        
+        # Draw grid
+        for x in range(0, grid_width * grid_size, grid_size):
+            pygame.draw.line(surface, (40, 40, 40), (10 + x, 10), (10 + x, 10 + grid_height * grid_size))
+        for y in range(0, grid_height * grid_size, grid_size):
+            pygame.draw.line(surface, (40, 40, 40), (10, 10 + y), (10 + grid_width * grid_size, 10 + y))
+        return surface
+    
+    def compute_cell_positions(self, grid_size: int, grid_width: int, grid_height: int,
+                               origin_x: int, origin_y: int) -> List[Tuple[int, int]]:
+        """Top-left screen position of every cell, indexed by y * grid_width + x"""
+        return [(origin_x + x * grid_size, origin_y + y * grid_size)
+                for y in range(grid_height) for x in range(grid_width)]
+    
+    def cell_rect(self, x: int, y: int) -> pygame.Rect:
+        """Screen rectangle covered by a grid cell"""
+        return pygame.Rect(
+            self.game_area_x + x * self.grid_size, 
+            self.game_area_y + y * self.grid_size, 
+            self.grid_size, 
+            self.grid_size
         )
-        pygame.draw.rect(self.screen, RED, food_rect, border_radius=self.grid_size // 2)
+    
+    def draw_cell_background(self, x: int, y: int):
+        """Clear a grid cell back to the empty play field"""
+        rect = self.cell_rect(x, y)
+        source = rect.move(10 - self.game_area_x, 10 - self.game_area_y)
+        self.screen.blit(self.get_game_background(), rect, source)
+    
+    def get_sprite_atlas(self) -> SpriteAtlas:
+        """Sprites for the current grid size, rendered the first time it is used"""
+        atlas = self.sprite_atlases.get(self.grid_size)
+        if atlas is None:
+            atlas = self.sprite_atlases[self.grid_size] = self.render_sprite_atlas(self.grid_size)
+        return atlas
+    
+    def render_sprite_atlas(self, grid_size: int) -> SpriteAtlas:
+        """Pre-render the head for each direction, every body shade, food and special food"""
+        atlas = SpriteAtlas(grid_size)
+        
+        # Head with eyes looking the way it moves
+        eye_size = max(2, grid_size // 6)
+        eye_offset = grid_size // 4
+        for direction in Direction:
+            sprite = atlas.new_sprite()
+            pygame.draw.rect(sprite, DARK_GREEN, (2, 2, grid_size - 4, grid_size - 4), border_radius=3)
+            
+            if direction == Direction.RIGHT:
+                eye1 = (grid_size - eye_offset, eye_offset)
+                eye2 = (grid_size - eye_offset, grid_size - eye_offset * 2)
+            elif direction == Direction.LEFT:
+                eye1 = (eye_offset, eye_offset)
+                eye2 = (eye_offset, grid_size - eye_offset * 2)
+            elif direction == Direction.UP:
+                eye1 = (eye_offset, eye_offset)
+                eye2 = (grid_size - eye_offset * 2, eye_offset)
+            else:  # DOWN
+                eye1 = (eye_offset, grid_size - eye_offset)
+                eye2 = (grid_size - eye_offset * 2, grid_size - eye_offset)
+            
+            pygame.draw.circle(sprite, WHITE, eye1, eye_size)
+            pygame.draw.circle(sprite, WHITE, eye2, eye_size)
+            
+            # Pupils
+            pygame.draw.circle(sprite, BLACK, eye1, eye_size // 2)
+            pygame.draw.circle(sprite, BLACK, eye2, eye_size // 2)
+            atlas.heads[direction] = sprite
+        
+        # Body segments with a gradient that darkens along the first segments
+        for i in range(GRADIENT_SEGMENTS):
+            sprite = atlas.new_sprite()
+            color_offset = min(50, i * 2)  # Darken based on position
+            body_color = (
+                max(0, GREEN[0] - color_offset),
+                max(0, GREEN[1] - color_offset),
+                max(0, GREEN[2] - color_offset)
+            )
+            segment_rect = pygame.Rect(1, 1, grid_size - 2, grid_size - 2)
+            pygame.draw.rect(sprite, body_color, segment_rect, border_radius=2)
+            pygame.draw.rect(sprite, (0, 100, 0), segment_rect, width=1, border_radius=2)
+            atlas.bodies.append(sprite)
+        
+        # Food
+        atlas.food = atlas.new_sprite()
+        pygame.draw.rect(atlas.food, RED, (2, 2, grid_size - 4, grid_size - 4), border_radius=grid_size // 2)
+        
+        # Special food: one frame per pulse size, with a star in the middle
+        star_radius = grid_size // 3
+        for pulse_size in range(3):
+            sprite = atlas.new_sprite()
+            food_rect = pygame.Rect(2, 2, grid_size - 4, grid_size - 4)
+            pygame.draw.rect(
+                sprite, 
+                GOLD, 
+                food_rect.inflate(pulse_size * 2, pulse_size * 2), 
+                border_radius=(grid_size - 4 + pulse_size * 2) // 2
+            )
+            star_center = (grid_size // 2, grid_size // 2)
+            self.draw_star(sprite, star_center, 5, star_radius, star_radius // 2, BLACK)
+            atlas.special_food.append(sprite)
         
-        # Draw special food if it exists
+        return atlas
+    
+    def draw_snake_segment(self, i: int, x: int, y: int):
+        """Draw snake segment i (0 is the head) at grid cell (x, y)"""
+        atlas = self.get_sprite_atlas()
+        sprite = atlas.heads[self.direction] if i == 0 else atlas.body(i)
+        self.screen.blit(sprite, self.cell_rect(x, y))
+    
+    def draw_food(self):
+        """Draw the regular food (there is none while the board is too full to place it)"""
+        if self.food:
+            self.screen.blit(self.get_sprite_atlas().food, self.cell_rect(*self.food))
+    
+    def draw_special_food(self):
+        """Draw the pulsing special food if it exists"""
         if self.special_food:
             special_food_pos, spawn_time, points = self.special_food
-            food_rect = pygame.Rect(
-                self.game_area_x + special_food_pos[0] * self.grid_size + 2, 
-                self.game_area_y + special_food_pos[1] * self.grid_size + 2, 
-                self.grid_size - 4, 
-                self.grid_size - 4
-            )
             
             # Pulsing effect
             pulse = (pygame.time.get_ticks() % 1000) / 1000.0
             pulse_size = int(2 * (0.5 + 0.5 * math.sin(pulse * 2 * math.pi)))
             
-            pygame.draw.rect(
-                self.screen, 
-                GOLD, 
-                food_rect.inflate(pulse_size * 2, pulse_size * 2), 
-                border_radius=(self.grid_size - 4 + pulse_size * 2) // 2
-            )
-            
-            # Draw star in the middle
-            star_points = 5
-            star_radius = self.grid_size // 3
-            star_center = (
-                self.game_area_x + special_food_pos[0] * self.grid_size + self.grid_size // 2,
-                self.game_area_y + special_food_pos[1] * self.grid_size + self.grid_size // 2
-            )
-            self.draw_star(self.screen, star_center, star_points, star_radius, star_radius // 2, BLACK)
-        
-        # Draw score and game info
-        self.draw_game_ui()
-        
-        # Draw game over or paused overlay
-        if self.state == GameState.GAME_OVER:
-            self.draw_game_over()
-        elif self.state == GameState.PAUSED:
-            self.draw_paused()
+            sprite = self.get_sprite_atlas().special_food[pulse_size]
+            self.screen.blit(sprite, self.cell_rect(*special_food_pos))
     
     def draw_star(self, surface, center, points, outer_radius, inner_radius, color):
         """Draw a star shape"""
@@ -802,11 +1019,12 @@ class SnakeGame:
     def draw_game_ui(self):
         """Draw the game UI elements (score, level, etc.)"""
         # Draw score
-        score_text = self.font_medium.render(f'Score: {self.score}', True, WHITE)
+        score_text = self.text_cache.render(self.font_medium, f'Score: {self.score}', True, WHITE)
         self.screen.blit(score_text, (20, 20))
         
         # Draw difficulty
-        diff_text = self.font_small.render(
+        diff_text = self.text_cache.render(
+            self.font_small, 
             f'Difficulty: {self.difficulty.value["name"]}', 
             True, 
             WHITE
@@ -814,61 +1032,70 @@ class SnakeGame:
         self.screen.blit(diff_text, (20, 60))
         
         # Draw high score for current difficulty
-        diff_name = self.difficulty.value['name']
-        high_score = max([s['score'] for s in self.high_scores.get(diff_name, [{'score':0}])])
-        high_score_text = self.font_small.render(
+        high_score = self.current_high_score()
+        high_score_text = self.text_cache.render(
+            self.font_small, 
             f'High Score: {high_score}', 
             True, 
             GOLD if self.score >= high_score and self.score > 0 else WHITE
         )
         self.screen.blit(high_score_text, (20, 90))
+        
+        # Turbo mode indicator
+        if self.turbo:
+            turbo_text = self.text_cache.render(self.font_small, f'TURBO x{TURBO_FACTOR}', True, RED)
+            self.screen.blit(turbo_text, (20, 120))
+    
+    def current_high_score(self) -> int:
+        """Best score recorded for the current difficulty"""
+        return self.leaderboard().best_score
     
     def draw_game_over(self):
         """Draw the game over overlay"""
         # Semi-transparent overlay
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.game_over_overlay.get(*self.screen.get_size(), 180), (0, 0))
         
         # Game over text
-        game_over_text = self.font_large.render('GAME OVER', True, RED)
+        game_over_text = self.text_cache.render(self.font_large, 'GAME OVER', True, RED)
         game_over_rect = game_over_text.get_rect(center=(WINDOW_WIDTH // 2, 250))
         self.screen.blit(game_over_text, game_over_rect)
         
         # Score text
-        score_text = self.font_medium.render(f'Final Score: {self.score}', True, WHITE)
+        score_text = self.text_cache.render(self.font_medium, f'Final Score: {self.score}', True, WHITE)
         score_rect = score_text.get_rect(center=(WINDOW_WIDTH // 2, 350))
         self.screen.blit(score_text, score_rect)
         
-        # Check if this is a new high score
-        diff_name = self.difficulty.value['name']
-        high_scores = self.high_scores.get(diff_name, [])
-        is_high_score = len(high_scores) < 10 or any(self.score > score['score'] for score in high_scores)
-        
-        if is_high_score and self.score > 0:
-            high_score_text = self.font_medium.render('NEW HIGH SCORE!', True, GOLD)
+        if self.new_high_score:
+            high_score_text = self.text_cache.render(self.font_medium, 'NEW HIGH SCORE!', True, GOLD)
             high_score_rect = high_score_text.get_rect(center=(WINDOW_WIDTH // 2, 400))
             self.screen.blit(high_score_text, high_score_rect)
     
+    def render_overlay(self, width: int, height: int, alpha: int) -> pygame.Surface:
+        """Black window-sized overlay with the given opacity"""
+        overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, alpha))
+        return overlay
+    
     def draw_paused(self):
         """Draw the paused overlay"""
         # Semi-transparent overlay
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 150))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.pause_overlay.get(*self.screen.get_size(), 150), (0, 0))
         
         # Paused text
-        paused_text = self.font_large.render('PAUSED', True, WHITE)
+        paused_text = self.text_cache.render(self.font_large, 'PAUSED', True, WHITE)
         paused_rect = paused_text.get_rect(center=(WINDOW_WIDTH // 2, 300))
         self.screen.blit(paused_text, paused_rect)
         
         # Instructions
-        inst_text = self.font_small.render('Press ESC or click Resume to continue', True, LIGHT_GRAY)
+        inst_text = self.text_cache.render(self.font_small, 'Press ESC or click Resume to continue', True, LIGHT_GRAY)
         inst_rect = inst_text.get_rect(center=(WINDOW_WIDTH // 2, 370))
         self.screen.blit(inst_text, inst_rect)
     
     def update_ui_visibility(self):
         """Update visibility of UI elements based on game state"""
+        self.needs_redraw = True
+        self.full_redraw = True
+        
         # Hide all buttons first
         for button in self.buttons.values():
             button.hide()
@@ -937,7 +1164,6 @@ class SnakeGame:
         self.reset_game()
         self.state = GameState.PLAYING
         self.update_ui_visibility()
-        self.last_update_time = time.time()
     
     def show_high_score_input(self):
         """Show dialog to enter name for high score"""
@@ -948,10 +1174,13 @@ class SnakeGame:
         
         # Default name
         input_text = 'Player'
+        cursor_visible = None
         
-        # Simple input loop
+        # Simple input loop, redrawn only on input or when the cursor blinks
         while input_active:
-            for event in pygame.event.get():
+            blink_wait = CURSOR_BLINK_MS - int(time.time() * 1000) % CURSOR_BLINK_MS
+            events = self.wait_for_events(blink_wait)
+            for event in events:
                 if event.type == pygame.QUIT:
                     return
                 elif event.type == pygame.KEYDOWN:
@@ -964,6 +1193,11 @@ class SnakeGame:
                     elif len(input_text) < 10:  # Limit name length
                         input_text += event.unicode
             
+            blink_on = int(time.time() * 1000) // CURSOR_BLINK_MS % 2 == 0
+            if not events and blink_on == cursor_visible:
+                continue
+            cursor_visible = blink_on
+            
             # Draw
             self.draw()
             
@@ -972,16 +1206,16 @@ class SnakeGame:
             pygame.draw.rect(self.screen, (50, 50, 50), input_rect.inflate(-4, -4))
             
             # Draw text
-            font = pygame.font.SysFont('Arial', 24)
-            text_surface = font.render('Enter your name:', True, WHITE)
+            font = fonts.get('Arial', 24)
+            text_surface = self.text_cache.render(font, 'Enter your name:', True, WHITE)
             self.screen.blit(text_surface, (input_rect.x, input_rect.y - 30))
             
             # Draw input text
-            text_surface = font.render(input_text, True, WHITE)
+            text_surface = self.text_cache.render(font, input_text, True, WHITE)
             self.screen.blit(text_surface, (input_rect.x + 5, input_rect.y + 5))
             
             # Draw cursor
-            if int(time.time() * 2) % 2 == 0:  # Blinking cursor
+            if cursor_visible:  # Blinking cursor
                 cursor_x = input_rect.x + 5 + font.size(input_text)[0]
                 pygame.draw.line(
                     self.screen, 
@@ -992,37 +1226,64 @@ class SnakeGame:
                 )
             
             pygame.display.flip()
-            self.clock.tick(30)
         
         # Add high score
         if input_text.strip():
             self.add_high_score(input_text.strip(), self.score)
+            self.full_redraw = True
     
     def draw_centered_text(self, text, color, y_offset=0, font_size=36):
         """Draw centered text on the screen"""
-        font = pygame.font.SysFont('Arial', font_size)
-        text_surface = font.render(text, True, color)
+        font = fonts.get('Arial', font_size)
+        text_surface = self.text_cache.render(font, text, True, color)
         text_rect = text_surface.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + y_offset))
         self.screen.blit(text_surface, text_rect)
 
+    def advance(self, time_delta: float):
+        """Run as many fixed-length logic ticks as the elapsed time allows"""
+        # Only update game logic if we're playing
+        if self.state != GameState.PLAYING:
+            self.tick_accumulator = 0.0
+            return
+        
+        # Game time only advances here, in whole ticks; turbo runs more of
+        # them per frame and draws only the last
+        speed_up = TURBO_FACTOR if self.turbo else 1
+        tick_length = 1.0 / (self.speed * speed_up)
+        self.tick_accumulator = min(self.tick_accumulator + time_delta,
+                                    tick_length * MAX_TICKS_PER_FRAME * speed_up)
+        while self.tick_accumulator >= tick_length and self.state == GameState.PLAYING:
+            self.update()
+            self.tick_accumulator -= tick_length
+
     def run(self):
         """Main game loop"""
         self.state = GameState.MAIN_MENU
         self.update_ui_visibility()
-        self.last_update_time = time.time()
         
         running = True
         while running:
-            running = self.handle_events()
+            # Menus and overlays block until there is input; while playing,
+            # sleep until the next frame is due
+            events = self.wait_for_events(IDLE_TIMEOUT_MS) if self.state in IDLE_STATES else None
+            time_delta = self.clock.tick(FPS) / 1000.0
+            was_playing = self.state == GameState.PLAYING
+            running = self.handle_events(time_delta, events)
+            # The time spent waiting on a menu or the pause screen is not
+            # game time, so a game that just started or resumed runs no
+            # catch-up ticks
+            self.advance(time_delta if was_playing else 0.0)
             
-            # Only update game logic if we're playing
-            if self.state == GameState.PLAYING:
-                self.update()
-            
-            self.draw()
-            self.clock.tick(FPS)
+            # Between logic ticks the play field only changes when the
+            # special food pulses
+            if self.state == GameState.PLAYING and self.special_food:
+                self.needs_redraw = True
+            if self.needs_redraw:
+                self.draw()
+                self.needs_redraw = False
         
         # Clean up
+        self.score_writer.close()
         pygame.quit()
         sys.exit()
 
@@ -0,0 +1,62 @@
+"""Regression tests for SnakeEngine's push()/pop() undo frames.
+
+Run with: python -m unittest test_snake_engine
+"""
+import random
+import unittest
+
+from snake_engine import Direction, SnakeEngine
+
+MOVES = [Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT]
+
+
+def engine_state(engine: SnakeEngine) -> tuple:
+    """Everything push()/pop() must restore, including the raw ring buffer and free-cell index"""
+    return (engine._scalars(), list(engine.snake), engine.food, engine.special_food,
+            engine._body.tolist(), engine._occupied.hex(),
+            engine._free.tolist(), engine._free_pos.tolist(), engine.rng.getstate())
+
+
+class UndoTest(unittest.TestCase):
+
+    def check_round_trip(self, engine: SnakeEngine, depth: int, rng: random.Random):
+        """push/step depth times, then pop back, comparing against a clone at every level"""
+        saved = []
+        for _ in range(depth):
+            saved.append(engine_state(engine.clone()))
+            engine.push()
+            engine.step(rng.choice(MOVES))
+        for expected in reversed(saved):
+            engine.pop()
+            self.assertEqual(engine_state(engine), expected)
+
+    def test_pop_restores_state(self):
+        rng = random.Random(1)
+        for trial in range(300):
+            engine = SnakeEngine(4, 4, seed=trial)
+            for _ in range(rng.randrange(20)):
+                engine.step(rng.choice(MOVES))
+            self.check_round_trip(engine, rng.randrange(1, 40), rng)
+
+    def test_frames_wrapping_the_ring_buffer(self):
+        # Longer than area - length, so the head reuses the body's slots
+        rng = random.Random(2)
+        for trial in range(50):
+            engine = SnakeEngine(5, 3, seed=trial)
+            area = engine.grid_width * engine.grid_height
+            self.check_round_trip(engine, area - len(engine.snake) + 10 + trial, rng)
+
+    def test_single_frame_over_many_steps(self):
+        rng = random.Random(3)
+        for trial in range(100):
+            engine = SnakeEngine(4, 4, seed=trial)
+            expected = engine_state(engine.clone())
+            engine.push()
+            for _ in range(rng.randrange(1, 60)):
+                engine.step(rng.choice(MOVES))
+            engine.pop()
+            self.assertEqual(engine_state(engine), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,326 @@
+"""Local service that verifies replay-backed high score submissions.
+
+A submission is a player name on one UTF-8 line followed by the bytes of a
+replay (see replay.py). Submissions arrive as *.sub files dropped into a
+watched directory, or over a TCP socket bound to localhost, one per
+connection. Each replay is re-simulated in a concurrent.futures process
+pool, and only scores the re-simulation reproduces are added to the high
+score store. Verdicts are cached by the SHA-256 of the replay, so a replay
+submitted twice is simulated, and scored, once.
+
+The store is the SQLite database by default, which the game can share
+while it runs with SNAKE_HIGH_SCORE_BACKEND=sqlite. Setting
+SNAKE_SCORE_SUBMISSIONS makes the game drop its high scores into that
+directory instead of saving them itself.
+
+Run with: python verify_service.py --watch submissions --port 8765
+"""
+import argparse
+import hashlib
+import os
+import socketserver
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from leaderboard import DEFAULT_CAPACITY, Leaderboard
+from replay import ReplayVerdict, parse_replay, verify_replay
+from score_store import JournalStore, ScoreWriter, SqliteStore
+
+SUBMISSION_SUFFIX = '.sub'
+MAX_SUBMISSION_SIZE = 1 << 20  # Bytes; hours of play are a few kilobytes
+MAX_NAME_LENGTH = 10  # As in the game's name entry
+VERDICT_CACHE_SIZE = 100000  # Replay hashes whose verdicts are remembered
+LATENCY_WINDOW = 10000  # Latest verdicts that throughput and p99 are measured over
+POLL_INTERVAL = 0.5  # Seconds between scans of a watched directory
+DEFAULT_PORT = 8765
+ACCEPTED_DIR = 'accepted'  # Subdirectories that handled submission files move to
+REJECTED_DIR = 'rejected'
+
+
+def encode_submission(name: str, replay_data: bytes) -> bytes:
+    """Build a submission from a player name and a replay"""
+    return name.replace('\n', ' ').encode('utf-8') + b'\n' + replay_data
+
+
+def decode_submission(data: bytes) -> Tuple[str, bytes]:
+    """Split a submission into (player name, replay bytes)"""
+    name, _, replay_data = data.partition(b'\n')
+    return name.decode('utf-8', 'replace').strip()[:MAX_NAME_LENGTH] or 'Player', replay_data
+
+
+def submission_path(directory: str, replay_data: bytes) -> str:
+    """Where to drop a submission of replay_data into a watched directory
+
+    Write it there atomically (e.g. with ScoreWriter.write_file), so the
+    watcher never reads a partly written file.
+    """
+    digest = hashlib.sha256(replay_data).hexdigest()[:16]
+    return os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{digest}{SUBMISSION_SUFFIX}")
+
+
+class ServiceStats:
+    """Counters plus the latency of the latest LATENCY_WINDOW verdicts"""
+
+    def __init__(self):
+        self.submitted = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.cache_hits = 0
+        self.started = time.perf_counter()
+        self._finished: deque = deque(maxlen=LATENCY_WINDOW)  # (finish time, latency)
+
+    def add_verdict(self, latency: float):
+        self._finished.append((time.perf_counter(), latency))
+
+    @property
+    def throughput(self) -> float:
+        """Verdicts per second over the latency window"""
+        if not self._finished:
+            return 0.0
+        first = self._finished[0][0] if len(self._finished) == LATENCY_WINDOW else self.started
+        elapsed = self._finished[-1][0] - first
+        return len(self._finished) / elapsed if elapsed > 0 else 0.0
+
+    def latency_percentile(self, percentile: float) -> float:
+        """Seconds from submission to verdict that percentile of submissions beat"""
+        latencies = sorted(latency for _, latency in self._finished)
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percentile / 100))]
+
+    def summary(self) -> str:
+        return (f"{self.submitted} submitted, {self.accepted} accepted, {self.rejected} rejected, "
+                f"{self.cache_hits} cached; {self.throughput:.1f} verdicts/sec, "
+                f"p50 {self.latency_percentile(50) * 1000:.1f} ms, p99 {self.latency_percentile(99) * 1000:.1f} ms")
+
+
+class VerificationService:
+    """Verifies submissions on a process pool and stores the scores that hold up
+
+    submit() may be called from any thread. Verdicts come back on the
+    pool's result thread, where accepted scores are added to the in-memory
+    leaderboards and queued on a ScoreWriter.
+    """
+
+    def __init__(self, store, workers: Optional[int] = None,
+                 capacity: int = DEFAULT_CAPACITY, cache_size: int = VERDICT_CACHE_SIZE):
+        self.capacity = capacity
+        self.cache_size = cache_size
+        self.stats = ServiceStats()
+        self._executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+        self._verdicts: 'OrderedDict[str, ReplayVerdict]' = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}  # Replays being simulated, so duplicates wait for them
+        self._lock = threading.Lock()  # Guards the cache, in-flight map and stats
+        # Guards the leaderboards; held while ScoreWriter.append may block
+        # on a full queue, so it must never be taken inside _lock
+        self._score_lock = threading.Lock()
+
+        self.score_writer = ScoreWriter(store)
+        tables = store.load({})
+        self.high_scores = {name: Leaderboard(capacity, entries) for name, entries in tables.items()}
+
+    def submit(self, name: str, replay_data: bytes) -> Future:
+        """Queue a replay for verification; the future resolves to its ReplayVerdict"""
+        submitted = time.perf_counter()
+        digest = hashlib.sha256(replay_data).hexdigest()
+        with self._lock:
+            self.stats.submitted += 1
+            verdict = self._verdicts.get(digest)
+            if verdict is not None:
+                self._verdicts.move_to_end(digest)
+                self.stats.cache_hits += 1
+                self.stats.add_verdict(time.perf_counter() - submitted)
+                future: Future = Future()
+                future.set_result(verdict)
+                return future
+            if digest in self._in_flight:
+                self.stats.cache_hits += 1
+                return self._in_flight[digest]
+
+            future = self._executor.submit(verify_replay, replay_data)
+            self._in_flight[digest] = future
+        future.add_done_callback(lambda done: self._finish(done, digest, name, replay_data, submitted))
+        return future
+
+    def _finish(self, future: Future, digest: str, name: str, replay_data: bytes, submitted: float):
+        """Cache a verdict and store the score if the replay held up"""
+        try:
+            verdict = future.result()
+        except Exception as e:
+            # The worker itself failed; do not cache, so a resubmission retries
+            print(f"Error verifying replay: {e}")
+            with self._lock:
+                del self._in_flight[digest]
+            return
+
+        with self._lock:
+            del self._in_flight[digest]
+            self._verdicts[digest] = verdict
+            if len(self._verdicts) > self.cache_size:
+                self._verdicts.popitem(last=False)
+            self.stats.add_verdict(time.perf_counter() - submitted)
+            if not verdict.valid:
+                self.stats.rejected += 1
+                return
+            self.stats.accepted += 1
+        # Outside _lock, so submit() keeps going while the score writer is busy
+        if verdict.score > 0:
+            self._add_score(name, verdict.score, parse_replay(replay_data).difficulty.value['name'])
+
+    def _add_score(self, name: str, score: int, difficulty: str):
+        """Add a verified score the way SnakeGame.add_high_score does"""
+        entry = {
+            "name": name,
+            "score": score,
+            "date": time.strftime("%Y-%m-%d")
+        }
+        with self._score_lock:
+            board = self.high_scores.setdefault(difficulty, Leaderboard(self.capacity))
+            if not board.add(entry):
+                return
+            self.score_writer.append(difficulty, entry)
+            if self.score_writer.should_compact:
+                self.score_writer.compact({key: table.entries() for key, table in self.high_scores.items()})
+
+    def close(self):
+        """Finish the queued verifications, then flush and close the store"""
+        self._executor.shutdown(wait=True)
+        self.score_writer.close()
+
+
+def scan_directory(service: VerificationService, directory: str, seen: set) -> List[Tuple[str, Future]]:
+    """Submit the submission files in directory that are not in seen yet"""
+    submitted = []
+    for file_name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, file_name)
+        if not file_name.endswith(SUBMISSION_SUFFIX) or path in seen:
+            continue
+        try:
+            with open(path, 'rb') as f:
+                data = f.read(MAX_SUBMISSION_SIZE + 1)
+        except OSError as e:
+            print(f"Error reading submission: {e}")
+            continue
+        seen.add(path)
+        future = service.submit(*decode_submission(data[:MAX_SUBMISSION_SIZE]))
+        future.add_done_callback(lambda done, path=path: file_verdict(path, done, seen))
+        submitted.append((path, future))
+    return submitted
+
+
+def file_verdict(path: str, future: Future, seen: set):
+    """Move a handled submission file into ACCEPTED_DIR or REJECTED_DIR next to it"""
+    if future.exception() is not None:
+        seen.discard(path)  # Try again on the next scan
+        return
+    verdict = future.result()
+    target = os.path.join(os.path.dirname(path), ACCEPTED_DIR if verdict.valid else REJECTED_DIR)
+    try:
+        os.makedirs(target, exist_ok=True)
+        os.replace(path, os.path.join(target, os.path.basename(path)))
+        seen.discard(path)
+    except OSError as e:
+        print(f"Error moving submission: {e}")
+
+
+def watch_directory(service: VerificationService, directory: str, stop: threading.Event,
+                    poll_interval: float = POLL_INTERVAL):
+    """Submit submission files as they appear in directory until stop is set"""
+    os.makedirs(directory, exist_ok=True)
+    seen: set = set()
+    while not stop.is_set():
+        scan_directory(service, directory, seen)
+        stop.wait(poll_interval)
+
+
+class SubmissionHandler(socketserver.StreamRequestHandler):
+    """Reads one submission until the client shuts down its side, and answers with the verdict"""
+
+    def handle(self):
+        data = self.rfile.read(MAX_SUBMISSION_SIZE + 1)
+        if len(data) > MAX_SUBMISSION_SIZE:
+            self.wfile.write(b'rejected submission too large\n')
+            return
+        try:
+            verdict = self.server.service.submit(*decode_submission(data)).result()
+        except Exception as e:
+            self.wfile.write(f'error {e}\n'.encode('utf-8'))
+            return
+        if verdict.valid:
+            self.wfile.write(f'ok {verdict.score}\n'.encode('utf-8'))
+        else:
+            self.wfile.write(f'rejected {verdict.reason}\n'.encode('utf-8'))
+
+
+class SubmissionServer(socketserver.ThreadingTCPServer):
+    """TCP server on localhost that feeds submissions to a VerificationService"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, service: VerificationService, port: int = DEFAULT_PORT):
+        self.service = service
+        super().__init__(('127.0.0.1', port), SubmissionHandler)
+
+
+def create_store(args) -> Any:
+    """The high score store named on the command line"""
+    if args.json:
+        return JournalStore(args.json, args.json_journal or os.path.splitext(args.json)[0] + '.journal')
+    return SqliteStore(args.db)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verify replay-backed Snake high scores before storing them')
+    parser.add_argument('--watch', action='append', default=[], help='directory of *.sub files (repeatable)')
+    parser.add_argument('--port', type=int, default=None, help=f'also accept submissions on localhost:PORT '
+                        f'(e.g. {DEFAULT_PORT})')
+    parser.add_argument('--once', action='store_true', help='verify what is in the watched directories and exit')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--db', default='high_scores.db', help='SQLite high score database')
+    parser.add_argument('--json', default=None, help='use this JSON snapshot instead of the database')
+    parser.add_argument('--json-journal', default=None)
+    parser.add_argument('--report-every', type=float, default=10.0, help='seconds between stats lines')
+    args = parser.parse_args()
+    if not args.watch and args.port is None:
+        parser.error('give at least one --watch directory or a --port')
+
+    service = VerificationService(create_store(args), args.workers)
+    if args.once:
+        pending = []
+        for directory in args.watch:
+            pending += scan_directory(service, directory, set())
+        for _, future in pending:
+            future.exception()  # Wait for every verdict
+        service.close()
+        print(service.stats.summary())
+        return
+
+    stop = threading.Event()
+    threads = [threading.Thread(target=watch_directory, args=(service, directory, stop), daemon=True)
+               for directory in args.watch]
+    server = None
+    if args.port is not None:
+        server = SubmissionServer(service, args.port)
+        threads.append(threading.Thread(target=server.serve_forever, daemon=True))
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            time.sleep(args.report_every)
+            print(service.stats.summary())
+    except KeyboardInterrupt:
+        pass
+    stop.set()
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+    service.close()
+    print(service.stats.summary())
+
+
+if __name__ == "__main__":
+    main()